@@ -0,0 +1,181 @@
+import math
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+from zipfile import ZipFile, ZIP_DEFLATED
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for extension_dir in ["exts/mf.ov.gdtf", "exts/mf.ov.mvr"]:
+    extension_path = os.path.join(ROOT_DIR, extension_dir)
+    if extension_path not in sys.path:
+        sys.path.insert(0, extension_path)
+
+from pxr import Sdf, Usd  # noqa: E402
+
+SAMPLE_GDTF = os.path.join(ROOT_DIR, "exts/mf.ov.gdtf/sample/Robe_Lighting@Robin_MMX_Blade@2023-07-25__Beam_revision.gdtf")
+SAMPLE_MVR_7_FIXTURES = os.path.join(ROOT_DIR, "exts/mf.ov.mvr/sample/7-fixtures-sample.mvr")
+SAMPLE_MVR_FIXTURE_LINE = os.path.join(ROOT_DIR, "exts/mf.ov.mvr/sample/fixture-line-gltf.mvr")
+SAMPLE_MVR_7X_ROBE = os.path.join(ROOT_DIR, "resources/7xRobe.mvr")
+
+FIXTURE_TEMPLATE = """          <Fixture name="{name}" uuid="{uuid}">
+            <Matrix>{matrix}</Matrix>
+            <GDTFSpec>{spec}.gdtf</GDTFSpec>
+            <GDTFMode>Mode 1</GDTFMode>
+            <Addresses>
+              <Address break="0">{address}</Address>
+            </Addresses>
+            <FixtureID>{index}</FixtureID>
+            <UnitNumber>0</UnitNumber>
+            <FixtureTypeId>0</FixtureTypeId>
+            <CustomId>0</CustomId>
+            <Color>0.312712,0.329008,100.000000</Color>
+            <CastShadow>false</CastShadow>
+          </Fixture>
+"""
+
+
+def make_synthetic_matrices(count: int, seed: int = 0) -> List[str]:
+    # MVR matrices of fixtures hung on a grid, randomly panned and tilted
+    rng = random.Random(seed)
+    grid_size = max(1, math.ceil(math.sqrt(count)))
+    matrices: List[str] = []
+    for i in range(count):
+        yaw = math.radians(rng.uniform(-180, 180))
+        tilt = math.radians(rng.uniform(-90, 90))
+        x, y, z = (i % grid_size) * 500.0, (i // grid_size) * 500.0, 6000.0 + rng.uniform(-500, 500)
+        rows = [
+            (math.cos(yaw), math.sin(yaw), 0),
+            (-math.sin(yaw) * math.cos(tilt), math.cos(yaw) * math.cos(tilt), math.sin(tilt)),
+            (math.sin(yaw) * math.sin(tilt), -math.cos(yaw) * math.sin(tilt), math.cos(tilt)),
+            (x, y, z),
+        ]
+        matrices.append("".join("{" + ",".join(f"{v:.6f}" for v in row) + "}" for row in rows))
+    return matrices
+
+
+def make_synthetic_mvr(path: str, fixture_count: int, spec_count: int = 1, layer_count: int = 1,
+                       gdtf_path: str = SAMPLE_GDTF, seed: int = 0) -> str:
+    # Scales a scene up by repeating the sample gdtf under several spec names, fixtures laid out on a grid
+    specs: List[str] = [f"Synthetic@Fixture {i}" for i in range(spec_count)]
+    matrices: List[str] = make_synthetic_matrices(fixture_count, seed)
+
+    layers: List[List[str]] = [[] for _ in range(layer_count)]
+    for i, matrix in enumerate(matrices):
+        fixture = FIXTURE_TEMPLATE.format(name=f"Fixture {i}", uuid=f"{seed:08X}-0000-4000-8000-{i:012X}",
+                                          matrix=matrix, spec=specs[i % spec_count], address=i * 16 + 1, index=i)
+        layers[i % layer_count].append(fixture)
+
+    xml = ['<?xml version="1.0" encoding="UTF-8" standalone="no" ?>\n',
+           '<GeneralSceneDescription verMajor="1" verMinor="5">\n  <Scene>\n    <Layers>\n']
+    for i, fixtures in enumerate(layers):
+        xml.append(f'      <Layer name="Layer {i}" uuid="{seed:08X}-0000-4000-9000-{i:012X}">\n        <ChildList>\n')
+        xml.extend(fixtures)
+        xml.append('        </ChildList>\n      </Layer>\n')
+    xml.append('    </Layers>\n  </Scene>\n</GeneralSceneDescription>\n')
+
+    with open(gdtf_path, "rb") as f:
+        gdtf_data = f.read()
+    with ZipFile(path, "w", ZIP_DEFLATED) as archive:
+        archive.writestr("GeneralSceneDescription.xml", "".join(xml))
+        for spec in specs:
+            archive.writestr(f"{spec}.gdtf", gdtf_data)
+    return path
+
+
+def extract_gdtf(mvr_path: str, output_dir: str) -> str:
+    # Extracts the first gdtf of an mvr, to scale its scene up with make_synthetic_mvr
+    with ZipFile(mvr_path, "r") as archive:
+        name = next(x for x in archive.namelist() if x.endswith(".gdtf"))
+        path = os.path.join(output_dir, os.path.basename(name))
+        with open(path, "wb") as f:
+            f.write(archive.read(name))
+    return path
+
+
+def get_peak_rss_mb() -> float:
+    # Peak resident memory of the current process, None when it cannot be measured
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024  # Bytes on macOS, kilobytes elsewhere
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 ** 2
+    except (ImportError, AttributeError):
+        return None
+
+
+@contextmanager
+def count_saves():
+    # Stage saves and layer saves made from python, as MVRImporter._save does.
+    # Layers saved by Usd.Stage.Save are saved in C++, they are not counted a second time
+    counter: Dict[str, int] = {"saves": 0}
+    stage_save = Usd.Stage.Save
+    layer_save = Sdf.Layer.Save
+
+    def counting_stage_save(stage: Usd.Stage, *args):
+        counter["saves"] += 1
+        return stage_save(stage, *args)
+
+    def counting_layer_save(layer: Sdf.Layer, *args, **kwargs):
+        counter["saves"] += 1
+        return layer_save(layer, *args, **kwargs)
+
+    Usd.Stage.Save = counting_stage_save
+    Sdf.Layer.Save = counting_layer_save
+    try:
+        yield counter
+    finally:
+        Usd.Stage.Save = stage_save
+        Sdf.Layer.Save = layer_save
+
+
+@contextmanager
+def record_calls(phases: Dict[str, List[Tuple[object, str]]]):
+    # Wraps functions of classes or modules to accumulate their calls and wall time per phase.
+    # Phases may nest: a save called during the gdtf phase counts in both.
+    result: Dict[str, Dict[str, float]] = {name: {"seconds": 0.0, "calls": 0} for name in phases}
+    originals: List[Tuple[object, str, object]] = []
+
+    def wrap(phase: str, function):
+        def recording(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                result[phase]["seconds"] += time.perf_counter() - start
+                result[phase]["calls"] += 1
+        return recording
+
+    for phase, targets in phases.items():
+        for owner, name in targets:
+            function = getattr(owner, name)
+            originals.append((owner, name, function))
+            setattr(owner, name, wrap(phase, function))
+    try:
+        yield result
+    finally:
+        for owner, name, function in reversed(originals):
+            setattr(owner, name, function)
+
+
+def get_directory_size(directory: str) -> int:
+    size = 0
+    for dirpath, _, filenames in os.walk(directory):
+        size += sum([os.path.getsize(os.path.join(dirpath, x)) for x in filenames])
+    return size
+
+
+@contextmanager
+def timer():
+    result: Dict[str, float] = {"seconds": 0.0}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
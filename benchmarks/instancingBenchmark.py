@@ -0,0 +1,77 @@
+"""
+Compares stage open time and memory of MVR imports with and without instanceable gdtf references.
+The scene of resources/7xRobe.mvr is scaled up synthetically, every fixture using its gdtf.
+
+Must run with a python able to import the extensions (Kit's bundled python):
+    python benchmarks/instancingBenchmark.py --counts 100 1000 5000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarkUtil import SAMPLE_MVR_7X_ROBE, extract_gdtf, get_peak_rss_mb, make_synthetic_mvr, timer
+
+from pxr import Usd
+
+from mf.ov.mvr.converterContext import ConverterContext
+from mf.ov.mvr.filepathUtility import Filepath
+from mf.ov.mvr.mvrImporter import MVRImporter
+
+
+def convert(mvr_path: str, output_dir: str, instanceable: bool) -> str:
+    context = ConverterContext()
+    context.deferred_save = True
+    context.instanceable_references = instanceable
+    return MVRImporter.convert(Filepath(mvr_path), output_dir, context=context)
+
+
+def measure_open(url: str):
+    # Runs in a fresh process, the peak memory of the importer must not be counted
+    with timer() as elapsed:
+        stage = Usd.Stage.Open(url)
+        prim_count = len(list(stage.Traverse()))  # Instance proxies are not composed prims
+    print(json.dumps({"seconds": elapsed["seconds"], "prims": prim_count, "prototypes": len(stage.GetPrototypes()),
+                      "peak_rss_mb": get_peak_rss_mb()}))
+
+
+def run(fixture_count: int, instanceable: bool, gdtf_path: str, work_dir: str):
+    mvr_path = make_synthetic_mvr(os.path.join(work_dir, f"synthetic_{fixture_count}.mvr"), fixture_count,
+                                  gdtf_path=gdtf_path)
+    output_dir = os.path.join(work_dir, f"out_{fixture_count}_{instanceable}").replace("\\", "/") + "/"
+    url = convert(mvr_path, output_dir, instanceable)
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--open", url], check=True,
+                            capture_output=True, text=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--mvr", default=SAMPLE_MVR_7X_ROBE, help="Mvr providing the gdtf of the synthetic fixtures")
+    parser.add_argument("--open", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.open is not None:
+        measure_open(args.open)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="mf_ov_instancing_benchmark_")
+    try:
+        gdtf_path = extract_gdtf(args.mvr, work_dir)
+        print(f"{'fixtures':>10} {'mode':>12} {'prims':>10} {'prototypes':>10} {'seconds':>10} {'peak MB':>10}")
+        for fixture_count in args.counts:
+            for instanceable in [False, True]:
+                result = run(fixture_count, instanceable, gdtf_path, work_dir)
+                mode = "instanceable" if instanceable else "copies"
+                peak = result["peak_rss_mb"]
+                print(f"{fixture_count:>10} {mode:>12} {result['prims']:>10} {result['prototypes']:>10} "
+                      f"{result['seconds']:>10.3f} {peak if peak is None else round(peak, 1):>10}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Runs the MVR and GDTF conversion pipeline headlessly and writes the measures as JSON, to compare runs across commits.
+
+Cases are the bundled samples (7-fixtures-sample.mvr, fixture-line-gltf.mvr, the Robe GDTF) and synthetic scenes.
+Each case runs in its own process and records wall time, peak RSS, save count, output size and time per phase,
+along with the import report of the converter (phases by gdtf spec, prims, attributes and bytes written).
+
+Must run with a python able to import the extensions (Kit's bundled python):
+    python benchmarks/pipelineBenchmark.py --output before.json
+    python benchmarks/pipelineBenchmark.py --counts 10 100 1000 10000 100000 --context deferred_save=True
+
+Saving after every edit is quadratic, scenes above a few thousand fixtures need deferred_save or sdf_authoring.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import traceback
+from typing import Dict, List
+
+from benchmarkUtil import (ROOT_DIR, SAMPLE_GDTF, SAMPLE_MVR_7_FIXTURES, SAMPLE_MVR_FIXTURE_LINE, get_directory_size,
+                           get_peak_rss_mb, make_synthetic_mvr, record_calls, timer)
+
+from pxr import Sdf, Usd
+
+from mf.ov.gdtf.gdtfImporter import GDTFImporter
+from mf.ov.gdtf.importReport import ImportReport
+from mf.ov.mvr.converterContext import ConverterContext
+from mf.ov.mvr.filepathUtility import Filepath
+from mf.ov.mvr.mvrImporter import MVRImporter
+from mf.ov.mvr.mvrUtil import Layer
+
+SAMPLES = {
+    "gdtf:robe": SAMPLE_GDTF,
+    "mvr:7-fixtures-sample": SAMPLE_MVR_7_FIXTURES,
+    "mvr:fixture-line-gltf": SAMPLE_MVR_FIXTURE_LINE,
+}
+
+PHASES = {
+    "parse": [(MVRImporter, "_read_layers"), (MVRImporter, "_get_layers"), (Layer, "find_fixtures")],
+    "gdtf": [(MVRImporter, "_convert_gdtf_specs")],
+    "save": [(Usd.Stage, "Save"), (Sdf.Layer, "Save")],
+}
+
+
+def parse_context(values: List[str]) -> Dict[str, object]:
+    # key=value pairs set on ConverterContext, values are python literals
+    context: Dict[str, object] = {}
+    for value in values:
+        key, _, literal = value.partition("=")
+        if not hasattr(ConverterContext, key):
+            raise ValueError(f"Unknown ConverterContext attribute {key}")
+        context[key] = eval(literal, {}, {})
+    return context
+
+
+def run_case(case: str, context_values: Dict[str, object], work_dir: str) -> Dict[str, object]:
+    # Runs in a fresh process, called through --case
+    kind, _, name = case.partition(":")
+    output_dir = os.path.join(work_dir, "out").replace("\\", "/") + "/"
+    os.makedirs(output_dir, exist_ok=True)
+    if kind == "synthetic":
+        source = make_synthetic_mvr(os.path.join(work_dir, f"synthetic_{name}.mvr"), int(name))
+    else:
+        source = SAMPLES[case]
+
+    context = ConverterContext()
+    for key, value in context_values.items():
+        setattr(context, key, value)
+
+    result: Dict[str, object] = {"case": case, "ok": False}
+    report = ImportReport()
+    with record_calls(PHASES) as phases, timer() as elapsed:
+        try:
+            if kind == "gdtf":
+                with report.activate():
+                    url = GDTFImporter.convert(Filepath(source), output_dir)
+            else:
+                url = MVRImporter.convert(Filepath(source), output_dir, context=context)
+                report = context.import_report
+            result["ok"] = url is not None
+        except Exception:
+            result["error"] = traceback.format_exc()
+    result["wall_seconds"] = elapsed["seconds"]
+    result["peak_rss_mb"] = get_peak_rss_mb()
+    result["saves"] = phases["save"]["calls"]
+    result["output_bytes"] = get_directory_size(output_dir)
+    result["phases"] = phases
+    result["report"] = report.to_dict()
+    return result
+
+
+def run_in_process(case: str, context: List[str], timeout: float) -> Dict[str, object]:
+    work_dir = tempfile.mkdtemp(prefix="mf_ov_pipeline_benchmark_")
+    command = [sys.executable, os.path.abspath(__file__), "--case", case, "--work-dir", work_dir]
+    if len(context) > 0:
+        command += ["--context"] + context
+    try:
+        process = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        lines = process.stdout.strip().splitlines()
+        if process.returncode != 0 or len(lines) == 0:
+            return {"case": case, "ok": False, "error": process.stderr[-4000:]}
+        return json.loads(lines[-1])
+    except subprocess.TimeoutExpired:
+        return {"case": case, "ok": False, "error": f"Timed out after {timeout} seconds"}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def get_commit() -> str:
+    try:
+        process = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True)
+        return process.stdout.strip() if process.returncode == 0 else None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="*", default=[10, 100, 1000], help="Synthetic fixture counts")
+    parser.add_argument("--no-samples", action="store_true", help="Only run the synthetic scenes")
+    parser.add_argument("--context", nargs="*", default=[], help="ConverterContext overrides, as key=value")
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds allowed per case")
+    parser.add_argument("--output", help="JSON file to write, printed when omitted")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    context_values = parse_context(args.context)
+
+    if args.case is not None:
+        print(json.dumps(run_case(args.case, context_values, args.work_dir)))
+        return
+
+    cases = [] if args.no_samples else list(SAMPLES)
+    cases += [f"synthetic:{x}" for x in args.counts]
+    results = []
+    for case in cases:
+        result = run_in_process(case, args.context, args.timeout)
+        status = f"{result['wall_seconds']:.3f}s" if result["ok"] else "failed"
+        print(f"{case}: {status}", file=sys.stderr)
+        results.append(result)
+
+    report = {
+        "commit": get_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "context": {key: repr(value) for key, value in context_values.items()},
+        "results": results,
+    }
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
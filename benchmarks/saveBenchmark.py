@@ -0,0 +1,50 @@
+"""
+Compares the save count and wall time of MVR imports saving per edit, deferring saves and authoring at the Sdf level.
+
+Must run with a python able to import the extensions (Kit's bundled python):
+    python benchmarks/saveBenchmark.py --counts 10 100 1000 3000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from benchmarkUtil import count_saves, make_synthetic_mvr, timer
+
+from mf.ov.mvr.converterContext import ConverterContext
+from mf.ov.mvr.filepathUtility import Filepath
+from mf.ov.mvr.mvrImporter import MVRImporter
+
+
+MODES = ["per-edit", "deferred", "sdf"]
+
+
+def run(fixture_count: int, mode: str, work_dir: str):
+    mvr_path = make_synthetic_mvr(os.path.join(work_dir, f"synthetic_{fixture_count}.mvr"), fixture_count)
+    output_dir = os.path.join(work_dir, f"out_{fixture_count}_{mode}").replace("\\", "/") + "/"
+    context = ConverterContext()
+    context.deferred_save = mode == "deferred"
+    context.sdf_authoring = mode == "sdf"
+    with count_saves() as saves, timer() as elapsed:
+        MVRImporter.convert(Filepath(mvr_path), output_dir, context=context)
+    return saves["saves"], elapsed["seconds"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="mf_ov_save_benchmark_")
+    try:
+        print(f"{'fixtures':>10} {'mode':>10} {'saves':>8} {'seconds':>10}")
+        for fixture_count in args.counts:
+            for mode in MODES:
+                saves, seconds = run(fixture_count, mode, work_dir)
+                print(f"{fixture_count:>10} {mode:>10} {saves:>8} {seconds:>10.3f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
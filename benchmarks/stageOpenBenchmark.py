@@ -0,0 +1,91 @@
+"""
+Compares stage open time and memory of MVR imports referencing their gdtf stages and importing them as payloads.
+Payload stages are opened with nothing loaded, with one MVR layer loaded and with everything loaded.
+The scene of resources/7xRobe.mvr is scaled up synthetically, every fixture using its gdtf.
+
+Must run with a python able to import the extensions (Kit's bundled python):
+    python benchmarks/stageOpenBenchmark.py --counts 100 1000 5000 --layers 4
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Dict
+
+from benchmarkUtil import SAMPLE_MVR_7X_ROBE, extract_gdtf, get_peak_rss_mb, make_synthetic_mvr, timer
+
+from pxr import Usd
+
+from mf.ov.mvr.converterContext import ConverterContext
+from mf.ov.mvr.filepathUtility import Filepath
+from mf.ov.mvr.mvrImporter import MVRImporter
+
+# Open mode: import mode and what is loaded when opening
+OPEN_MODES = {
+    "references": (False, "all"),
+    "payloads, none loaded": (True, "none"),
+    "payloads, one layer": (True, "layer"),
+    "payloads, all loaded": (True, "all"),
+}
+
+
+def convert(mvr_path: str, output_dir: str, payloads: bool) -> str:
+    context = ConverterContext()
+    context.sdf_authoring = True
+    context.payloads = payloads
+    return MVRImporter.convert(Filepath(mvr_path), output_dir, context=context)
+
+
+def measure_open(url: str, load: str):
+    # Runs in a fresh process, the peak memory of the importer must not be counted
+    with timer() as elapsed:
+        stage = Usd.Stage.Open(url, Usd.Stage.LoadAll if load == "all" else Usd.Stage.LoadNone)
+        if load == "layer":
+            stage.Load(stage.GetDefaultPrim().GetAllChildren()[0].GetPath())
+        prim_count = len(list(stage.Traverse()))  # Prims under unloaded payloads are not composed
+    print(json.dumps({"seconds": elapsed["seconds"], "prims": prim_count, "peak_rss_mb": get_peak_rss_mb()}))
+
+
+def run(url: str, load: str) -> Dict[str, object]:
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--open", url, "--load", load], check=True,
+                            capture_output=True, text=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--layers", type=int, default=4, help="MVR layers the fixtures are spread across")
+    parser.add_argument("--mvr", default=SAMPLE_MVR_7X_ROBE, help="Mvr providing the gdtf of the synthetic fixtures")
+    parser.add_argument("--open", help=argparse.SUPPRESS)
+    parser.add_argument("--load", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.open is not None:
+        measure_open(args.open, args.load)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="mf_ov_stage_open_benchmark_")
+    try:
+        gdtf_path = extract_gdtf(args.mvr, work_dir)
+        print(f"{'fixtures':>10} {'mode':>22} {'prims':>10} {'seconds':>10} {'peak MB':>10}")
+        for fixture_count in args.counts:
+            mvr_path = make_synthetic_mvr(os.path.join(work_dir, f"synthetic_{fixture_count}.mvr"), fixture_count,
+                                          layer_count=args.layers, gdtf_path=gdtf_path)
+            urls: Dict[bool, str] = {}
+            for payloads in [False, True]:
+                output_dir = os.path.join(work_dir, f"out_{fixture_count}_{payloads}").replace("\\", "/") + "/"
+                urls[payloads] = convert(mvr_path, output_dir, payloads)
+            for mode, (payloads, load) in OPEN_MODES.items():
+                result = run(urls[payloads], load)
+                peak = result["peak_rss_mb"]
+                print(f"{fixture_count:>10} {mode:>22} {result['prims']:>10} {result['seconds']:>10.3f} "
+                      f"{peak if peak is None else round(peak, 1):>10}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
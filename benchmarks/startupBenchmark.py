@@ -0,0 +1,82 @@
+"""
+Measures the cost of loading each extension at Kit startup: importing the package and running on_startup.
+The modules loaded then are listed, the importer stack should only be loaded by the first conversion.
+
+Must run with Kit's bundled python, each measure runs in a fresh process:
+    python benchmarks/startupBenchmark.py --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from benchmarkUtil import timer
+
+EXTENSIONS = {
+    "mf.ov.gdtf": "MfOvGdtfExtension",
+    "mf.ov.mvr": "MfOvMvrExtension",
+}
+
+# Loaded by the importers, none of them should be imported at startup
+WATCHED_MODULES = ["numpy", "unidecode", "omni.kit.window.content_browser", "omni.kit.menu.utils",
+                   "mf.ov.gdtf.gdtfImporter", "mf.ov.mvr.mvrImporter"]
+
+
+def measure_startup(extension: str) -> Dict[str, object]:
+    # Runs in a fresh process, called through --extension
+    import pxr.Usd  # noqa: F401  Kit loads USD before the extensions
+    modules_before = set(sys.modules)
+    with timer() as startup:
+        module = __import__(extension, fromlist=[EXTENSIONS[extension]])
+        instance = getattr(module, EXTENSIONS[extension])()
+        instance.on_startup(extension)
+    modules_loaded: List[str] = sorted(set(sys.modules) - modules_before)
+
+    delegate = next(x for x in vars(instance).values() if hasattr(x, "convert_assets"))
+    with timer() as first_conversion:
+        if hasattr(delegate, "_load_converter"):
+            delegate._load_converter()
+    instance.on_shutdown()
+    return {
+        "startup_seconds": startup["seconds"],
+        "first_conversion_load_seconds": first_conversion["seconds"],
+        "modules_loaded": len(modules_loaded),
+        "watched_modules_loaded": [x for x in WATCHED_MODULES if x in modules_loaded],
+    }
+
+
+def run_in_process(extension: str) -> Dict[str, object]:
+    command = [sys.executable, os.path.abspath(__file__), "--extension", extension]
+    process = subprocess.run(command, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr)
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per extension, the median is kept")
+    parser.add_argument("--extension", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.extension is not None:
+        print(json.dumps(measure_startup(args.extension)))
+        return
+
+    results = {}
+    for extension in EXTENSIONS:
+        runs = [run_in_process(extension) for _ in range(args.repeat)]
+        results[extension] = {
+            "startup_seconds": statistics.median([x["startup_seconds"] for x in runs]),
+            "first_conversion_load_seconds": statistics.median([x["first_conversion_load_seconds"] for x in runs]),
+            "modules_loaded": runs[0]["modules_loaded"],
+            "watched_modules_loaded": runs[0]["watched_modules_loaded"],
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compares the per-fixture and the batched computation of fixture transforms from MVR matrices.
+
+Must run with a python able to import the extensions (Kit's bundled python):
+    python benchmarks/transformBenchmark.py --counts 1000 10000 100000
+"""
+import argparse
+from typing import List
+
+import numpy as np
+from pxr import Gf
+
+from benchmarkUtil import make_synthetic_matrices, timer
+
+from mf.ov.mvr.USDTools import USDTools
+
+
+def per_fixture(matrices: List[str], scale: float):
+    rotate_minus90deg_xaxis = Gf.Matrix3d(1, 0, 0, 0, 0, 1, 0, -1, 0)
+    translations, rotations = [], []
+    for matrix in matrices:
+        np_matrix: np.matrix = USDTools.np_matrix_from_mvr(matrix)
+        gf_matrix: Gf.Matrix4d = USDTools.gf_matrix_from_mvr(np_matrix, scale)
+        rotation: Gf.Rotation = gf_matrix.ExtractRotation()
+        euler: Gf.Vec3d = rotation.Decompose(Gf.Vec3d.XAxis(), Gf.Vec3d.YAxis(), Gf.Vec3d.ZAxis())
+        translations.append(rotate_minus90deg_xaxis * gf_matrix.ExtractTranslation())
+        rotations.append(rotate_minus90deg_xaxis * euler)
+    return np.array(translations), np.array(rotations)
+
+
+def batched(matrices: List[str], scale: float):
+    np_matrices: np.ndarray = USDTools.np_matrices_from_mvr(matrices)
+    return USDTools.transforms_from_mvr(np_matrices, scale)
+
+
+def rotate_zyx_matrices(rotations: np.ndarray) -> np.ndarray:
+    # (N, 3, 3) row vector matrices of rotateZYX ops from (N, 3) euler angles in degrees
+    def axis_rotations(axis: int, angles: np.ndarray) -> np.ndarray:
+        cos, sin = np.cos(angles), np.sin(angles)
+        i, j = [(1, 2), (2, 0), (0, 1)][axis]
+        matrices = np.zeros(angles.shape + (3, 3))
+        matrices[:, axis, axis] = 1
+        matrices[:, i, i], matrices[:, j, j], matrices[:, i, j], matrices[:, j, i] = cos, cos, sin, -sin
+        return matrices
+
+    radians = np.radians(rotations)
+    return axis_rotations(2, radians[:, 2]) @ axis_rotations(1, radians[:, 1]) @ axis_rotations(0, radians[:, 0])
+
+
+def orientation_error(rotations: np.ndarray, matrices: List[str]) -> float:
+    # Max angle in degrees between the authored orientations and the rotations closest to the MVR matrices.
+    # Orientations are compared rather than euler angles: near gimbal lock, close orientations can have euler
+    # angles far apart. Matrices written with a few decimals are not exactly orthonormal, the closest rotation
+    # is the reference rather than the Gf path, itself approximate
+    u, _, vt = np.linalg.svd(USDTools.np_matrices_from_mvr(matrices)[:, :3, :3])
+    closest = u @ vt
+    z_up_rotations = np.stack([rotations[:, 0], -rotations[:, 2], rotations[:, 1]], axis=1)  # Undo (x, z, -y)
+    relative = rotate_zyx_matrices(z_up_rotations) @ np.transpose(closest, (0, 2, 1))
+    cos = np.clip((np.trace(relative, axis1=1, axis2=2) - 1) / 2, -1, 1)
+    return np.degrees(np.arccos(cos)).max()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    scale = 0.1  # millimeters to centimeters
+    # Errors: max translation difference between both paths, max orientation error of each path in degrees
+    print(f"{'fixtures':>10} {'per-fixture s':>14} {'batched s':>10} {'speedup':>8} {'translation':>12} "
+          f"{'per-fixture deg':>16} {'batched deg':>12}")
+    for count in args.counts:
+        matrices = make_synthetic_matrices(count)
+        with timer() as per_fixture_time:
+            reference_translations, reference_rotations = per_fixture(matrices, scale)
+        with timer() as batched_time:
+            translations, rotations = batched(matrices, scale)
+
+        translation_error = np.abs(translations - reference_translations).max()
+        reference_rotation_error = orientation_error(reference_rotations, matrices)
+        rotation_error = orientation_error(rotations, matrices)
+        speedup = per_fixture_time["seconds"] / max(batched_time["seconds"], 1e-9)
+        print(f"{count:>10} {per_fixture_time['seconds']:>14.3f} {batched_time['seconds']:>10.3f} "
+              f"{speedup:>7.1f}x {translation_error:>12.2e} {reference_rotation_error:>16.2e} {rotation_error:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,18 @@
 import numpy as np
 from typing import List, Tuple
-from unidecode import unidecode
 from urllib.parse import unquote
 
-import omni.usd
-from pxr import Gf, Tf, Sdf, UsdLux, Usd, UsdGeom
+from pxr import Gf, Sdf, UsdLux, Usd, UsdGeom
+
+from .nameMapper import NameMapper
 
 
 class USDTools:
     def make_name_valid(name: str) -> str:
-        if name[:1].isdigit():
-            name = "_" + name
-        return Tf.MakeValidIdentifier(unidecode(name))
+        return NameMapper.make_name_valid(name)
 
     def get_context():
+        import omni.usd  # Kit only, the converters also run headless
         return omni.usd.get_context()
 
     def get_stage() -> Usd.Stage:
@@ -0,0 +1,63 @@
+import bisect
+import weakref
+from typing import Dict, List
+from zipfile import ZipFile, ZipInfo
+
+
+class ArchiveIndex:
+    # Members of an archive indexed once: lookup by name, by name prefix and by directory.
+    # Directory entries are not indexed, names are returned as written in the archive.
+    _shared = weakref.WeakKeyDictionary()
+
+    def __init__(self, archive: ZipFile, case_sensitive: bool = True):
+        self._case_sensitive = case_sensitive
+        self._members: Dict[str, ZipInfo] = {}
+        self._directories: Dict[str, List[str]] = {}
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            key = self._get_key(info.filename)
+            self._members[key] = info  # Last entry wins on duplicates, as with ZipFile.getinfo
+            directory = key.rpartition("/")[0]
+            self._directories.setdefault(directory, []).append(info.filename)
+        self._sorted_keys: List[str] = sorted(self._members)
+
+    def get_shared(archive: ZipFile, case_sensitive: bool = True) -> "ArchiveIndex":
+        # Index kept for the lifetime of the archive object, shared by every reader
+        indices: Dict[bool, ArchiveIndex] = ArchiveIndex._shared.setdefault(archive, {})
+        index = indices.get(case_sensitive)
+        if index is None:
+            index = ArchiveIndex(archive, case_sensitive)
+            indices[case_sensitive] = index
+        return index
+
+    def contains(self, name: str) -> bool:
+        return self._get_key(name) in self._members
+
+    def get_info(self, name: str) -> ZipInfo:
+        return self._members.get(self._get_key(name))
+
+    def get_name(self, name: str) -> str:
+        # Name as written in the archive, differs from name when matching case insensitively
+        info = self.get_info(name)
+        return info.filename if info is not None else None
+
+    def get_names_with_prefix(self, prefix: str) -> List[str]:
+        key_prefix = self._get_key(prefix)
+        start = bisect.bisect_left(self._sorted_keys, key_prefix)
+        names: List[str] = []
+        for key in self._sorted_keys[start:]:
+            if not key.startswith(key_prefix):
+                break
+            names.append(self._members[key].filename)
+        return names
+
+    def get_names_in_directory(self, directory: str) -> List[str]:
+        # Members directly in directory, not in its subdirectories
+        return list(self._directories.get(self._get_key(directory.rstrip("/")), []))
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def _get_key(self, name: str) -> str:
+        return name if self._case_sensitive else name.casefold()
@@ -0,0 +1,222 @@
+import hashlib
+import logging
+import omni.client
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from typing import BinaryIO, List, Tuple
+
+from .filepathUtility import Filepath
+
+
+def _read_converter_version() -> str:
+    toml_path = os.path.join(os.path.dirname(__file__), "../../../config/extension.toml")
+    try:
+        with open(toml_path, "r") as f:
+            match = re.search(r'^version\s*=\s*"([^"]+)"', f.read(), re.MULTILINE)
+            if match is not None:
+                return match.group(1)
+    except OSError:
+        pass
+    return "unknown"
+
+
+class FileLock:
+    # Lock file created exclusively, works across processes and Kit instances sharing a cache directory
+    STALE_SECONDS = 600
+
+    def __init__(self, path: str, timeout: float = 60.0):
+        self._path = path
+        self._timeout = timeout
+        self._fd = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        deadline = time.monotonic() + self._timeout
+        while True:
+            try:
+                self._fd = os.open(self._path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(self._fd, str(os.getpid()).encode())
+                return True
+            except FileExistsError:
+                self._remove_if_stale()
+                if not blocking or time.monotonic() > deadline:
+                    return False
+                time.sleep(0.05)
+
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+
+    def _remove_if_stale(self):
+        # A crashed process never releases its lock
+        try:
+            if time.time() - os.path.getmtime(self._path) > FileLock.STALE_SECONDS:
+                os.remove(self._path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        if not self.acquire():
+            raise TimeoutError(f"Could not acquire lock {self._path}")
+        return self
+
+    def __exit__(self, *_):
+        self.release()
+
+
+class ConversionCache:
+    # Converted gdtf outputs stored under a hash of the .gdtf bytes, converter version and options.
+    # An entry holds the converted stage as "stage{ext}" and its models under "gltf/".
+    # Entries are published with an atomic rename and must be treated as read-only.
+    CONVERTER_VERSION = _read_converter_version()
+    DEFAULT_DIR = f"{tempfile.gettempdir()}/MF.OV.GDTF.cache/"
+    STAGE_NAME = "stage"
+    MODELS_DIR = "gltf"
+
+    def __init__(self, cache_dir: str = DEFAULT_DIR, max_size: int = 2 * 1024 ** 3):
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+
+    def get_key_from_file(self, path: str, output_ext: str) -> str:
+        with open(path, "rb") as f:
+            return self.get_key_from_stream(f, output_ext)
+
+    def get_key_from_stream(self, stream: BinaryIO, output_ext: str) -> str:
+        hasher = hashlib.sha256()
+        for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+            hasher.update(chunk)
+        return self._finalize_key(hasher, output_ext)
+
+    def _finalize_key(self, hasher, output_ext: str) -> str:
+        hasher.update(f"|{ConversionCache.CONVERTER_VERSION}|{output_ext}".encode())
+        return hasher.hexdigest()
+
+    def restore(self, key: str, output_dir: str, name: str, output_ext: str) -> str:
+        # Returns the url of the restored stage, None on cache miss
+        entry_dir = self._get_entry_dir(key)
+        if not os.path.isdir(entry_dir):
+            return None
+        try:
+            with FileLock(self._get_lock_path(key)):
+                if not os.path.isdir(entry_dir):  # Evicted while waiting for the lock
+                    return None
+                url = ConversionCache._restore_entry(entry_dir, output_dir, name, output_ext)
+                os.utime(entry_dir)  # Least recently used eviction is based on the entry mtime
+                return url
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.warn(f"Failed to restore {name} from the gdtf conversion cache, converting instead. {e}")
+            return None
+
+    def store(self, key: str, output_dir: str, name: str, output_ext: str):
+        entry_dir = self._get_entry_dir(key)
+        if os.path.isdir(entry_dir):
+            return
+        tmp_dir = f"{entry_dir}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(tmp_dir)
+            ConversionCache._populate_entry(tmp_dir, output_dir, name, output_ext)
+            with FileLock(self._get_lock_path(key)):
+                if not os.path.isdir(entry_dir):
+                    os.rename(tmp_dir, entry_dir)
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.warn(f"Failed to store {name} in the gdtf conversion cache. {e}")
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict()
+
+    def evict(self):
+        # Removes least recently used entries until the cache fits in max_size
+        try:
+            with FileLock(os.path.join(self._cache_dir, "eviction.lock")):
+                entries: List[Tuple[float, int, str]] = []
+                for key in os.listdir(self._cache_dir):
+                    entry_dir = self._get_entry_dir(key)
+                    if os.path.isdir(entry_dir) and not key.endswith(".tmp"):
+                        entries.append((os.path.getmtime(entry_dir), ConversionCache._get_size(entry_dir), key))
+                total_size = sum([x[1] for x in entries])
+                for _, size, key in sorted(entries):
+                    if total_size <= self._max_size:
+                        break
+                    lock = FileLock(self._get_lock_path(key))
+                    if lock.acquire(blocking=False):  # Skip entries being restored
+                        try:
+                            shutil.rmtree(self._get_entry_dir(key))
+                            total_size -= size
+                        finally:
+                            lock.release()
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.warn(f"Failed to evict entries from the gdtf conversion cache. {e}")
+
+    def _get_entry_dir(self, key: str) -> str:
+        return os.path.join(self._cache_dir, key)
+
+    def _get_lock_path(self, key: str) -> str:
+        os.makedirs(self._cache_dir, exist_ok=True)
+        return os.path.join(self._cache_dir, key + ".lock")
+
+    def _get_size(directory: str) -> int:
+        size = 0
+        for dirpath, _, filenames in os.walk(directory):
+            size += sum([os.path.getsize(os.path.join(dirpath, x)) for x in filenames])
+        return size
+
+    def _populate_entry(entry_dir: str, output_dir: str, name: str, output_ext: str):
+        ConversionCache._copy_file(output_dir + name + output_ext,
+                                   os.path.join(entry_dir, ConversionCache.STAGE_NAME + output_ext))
+        models_dir = output_dir + ConversionCache.MODELS_DIR + "/"
+        entry_models_dir = os.path.join(entry_dir, ConversionCache.MODELS_DIR)
+        os.makedirs(entry_models_dir)
+        for model_file in ConversionCache._list_files(models_dir):
+            ConversionCache._copy_file(models_dir + model_file, os.path.join(entry_models_dir, model_file))
+
+    def _restore_entry(entry_dir: str, output_dir: str, name: str, output_ext: str) -> str:
+        url = output_dir + name + output_ext
+        # The stage is copied, models are hard linked when the output is on the same local volume
+        ConversionCache._copy_file(os.path.join(entry_dir, ConversionCache.STAGE_NAME + output_ext), url)
+        entry_models_dir = os.path.join(entry_dir, ConversionCache.MODELS_DIR)
+        models_dir = output_dir + ConversionCache.MODELS_DIR + "/"
+        for model_file in os.listdir(entry_models_dir):
+            ConversionCache._link_file(os.path.join(entry_models_dir, model_file), models_dir + model_file)
+        return url
+
+    def _list_files(directory: str) -> List[str]:
+        if Filepath(directory).is_nucleus_path():
+            result, entries = omni.client.list(directory)
+            if result != omni.client.Result.OK:
+                return []
+            return [x.relative_path for x in entries]
+        if not os.path.isdir(directory):
+            return []
+        return [x for x in os.listdir(directory) if os.path.isfile(os.path.join(directory, x))]
+
+    def _copy_file(source: str, destination: str):
+        if Filepath(source).is_nucleus_path() or Filepath(destination).is_nucleus_path():
+            result = omni.client.copy(source, destination, omni.client.CopyBehavior.OVERWRITE)
+            if result != omni.client.Result.OK:
+                raise IOError(f"Could not copy {source} to {destination}: {result}")
+        else:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copyfile(source, destination)
+
+    def _link_file(source: str, destination: str):
+        if Filepath(destination).is_nucleus_path():
+            ConversionCache._copy_file(source, destination)
+            return
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        if os.path.exists(destination):
+            os.remove(destination)  # Never write through an existing link into the cache
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
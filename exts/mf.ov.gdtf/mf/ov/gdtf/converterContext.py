@@ -1,2 +1,7 @@
 class ConverterContext:
     usd_reference_path = ""
+    conversion_cache_dir = None  # Directory of the conversion cache shared across imports, None disables it
+    conversion_cache_max_size = 2 * 1024 ** 3  # Bytes, least recently used entries are evicted above it
+    source_memory_limit = 256 * 1024 ** 2  # Bytes, Nucleus sources larger than this are read through a temporary file
+    write_import_report = False  # Write the import report as JSON next to the output stage
+    import_report = None  # Set by each import, durations by phase and by spec, prims, attributes and bytes written
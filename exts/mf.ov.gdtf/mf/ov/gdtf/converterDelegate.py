@@ -2,22 +2,21 @@ import os
 
 import omni.kit.tool.asset_importer as ai
 
-from .converterOptionsBuilder import ConverterOptionsBuilder
-from .converterHelper import ConverterHelper
-
 
 class ConverterDelegate(ai.AbstractImporterDelegate):
+    # Registered at Kit startup: the options builder and the importers are only imported on the first conversion
     def __init__(self, name, filters, descriptions):
         super().__init__()
-        self._hoops_options_builder = ConverterOptionsBuilder()
-        self._hoops_converter = ConverterHelper()
+        self._hoops_options_builder = None
+        self._hoops_converter = None
+        self._progress_window_type = None
         self._name = name
         self._filters = filters
         self._descriptions = descriptions
 
     def destroy(self):
         if self._hoops_converter:
-            # self._hoops_converter.destroy()
+            self._hoops_converter.destroy()
             self._hoops_converter = None
 
         if self._hoops_options_builder:
@@ -41,7 +40,17 @@ class ConverterDelegate(ai.AbstractImporterDelegate):
         # TODO enable this after the filepicker bugfix: OM-47383
         # self._hoops_options_builder.build_pane(paths)
 
+    def _load_converter(self):
+        if self._hoops_converter is None:
+            from .converterOptionsBuilder import ConverterOptionsBuilder
+            from .converterHelper import ConverterHelper
+            from .importProgressWindow import ImportProgressWindow
+            self._progress_window_type = ImportProgressWindow
+            self._hoops_options_builder = ConverterOptionsBuilder()
+            self._hoops_converter = ConverterHelper()
+
     async def convert_assets(self, paths):
+        self._load_converter()
         context = self._hoops_options_builder.get_import_options()
         hoops_context = context.cad_converter_context
         absolute_paths = []
@@ -53,8 +62,13 @@ class ConverterDelegate(ai.AbstractImporterDelegate):
                 filename = os.path.basename(file_path)
                 relative_paths.append(filename)
 
-        converted_assets = await self._hoops_converter.create_import_task(
-            absolute_paths, context.export_folder, hoops_context
-        )
+        # The conversion runs in the background, the window shows its progress and can cancel it
+        progress_window = self._progress_window_type(f"Importing with {self._name}", self._hoops_converter.cancel)
+        try:
+            converted_assets = await self._hoops_converter.create_import_task(
+                absolute_paths, context.export_folder, hoops_context, progress_window.update
+            )
+        finally:
+            progress_window.destroy()
 
         return converted_assets
@@ -1,47 +1,107 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 import logging
-import shutil
+from typing import List
 from urllib.parse import unquote
 
 import omni.kit.window.content_browser
 
+from .conversionCache import ConversionCache
+from .converterContext import ConverterContext
 from .filepathUtility import Filepath
 from .gdtfImporter import GDTFImporter
-from .gltfImporter import GLTFImporter
+from .importProgress import ImportProgress, ProgressCallback
+from .importReport import ImportReport
+from .sourceReader import SourceReader, SourceReadError
+from .tempWorkspace import temp_workspace
 
 
 class ConverterHelper:
-    def _create_import_task(self, absolute_path, export_folder, _):
+    def __init__(self):
+        # Imports run one after the other on a background thread, the UI thread only awaits them
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mf.ov.gdtf.import")
+        self._progress: ImportProgress = None
+
+    def destroy(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def cancel(self):
+        # Stops at the next progress point of the running import, the next files are not imported
+        if self._progress is not None:
+            self._progress.cancel()
+
+    def _get_filepath(absolute_path) -> Filepath:
         absolute_path_unquoted = unquote(absolute_path)
         if absolute_path_unquoted.startswith("file:/"):
             path = absolute_path_unquoted[6:]
         else:
             path = absolute_path_unquoted
+        return Filepath(path)
 
-        current_nucleus_dir = omni.kit.window.content_browser.get_content_window().get_current_directory()
-
-        file: Filepath = Filepath(path)
+    def _create_import_task(self, absolute_path, export_folder, converter_context: ConverterContext,
+                            current_nucleus_dir: str, sources: SourceReader):
+        file: Filepath = ConverterHelper._get_filepath(absolute_path)
         output_dir = current_nucleus_dir if export_folder is None else export_folder
         if export_folder is not None and export_folder != "":
             output_dir = export_folder
 
-        # Cannot Unzip directly from Nucleus, must download file beforehand
-        if file.is_nucleus_path():
-            tmp_path = GLTFImporter.TMP_ARCHIVE_EXTRACT_DIR + file.basename
-            result = omni.client.copy(file.fullpath, tmp_path, omni.client.CopyBehavior.OVERWRITE)
-            if result == omni.client.Result.OK:
-                file = Filepath(tmp_path)
-            else:
-                logger = logging.getLogger(__name__)
-                logger.error(f"Could not import {file.fullpath} directly from Omniverse, try downloading the file instead")
-                return
-
-        url: str = GDTFImporter.convert(file, output_dir)
+        cache: ConversionCache = None
+        if converter_context.conversion_cache_dir is not None:
+            cache = ConversionCache(converter_context.conversion_cache_dir, converter_context.conversion_cache_max_size)
+
+        report = ImportReport()
+        try:
+            with report.activate(), ConverterHelper._open_source(file, sources) as source:
+                url: str = GDTFImporter.convert(file, output_dir, cache=cache, source=source)
+        except SourceReadError as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Could not import {file.fullpath} directly from Omniverse, "
+                         f"try downloading the file instead. {e}")
+            return
+        converter_context.import_report = report
+        if converter_context.write_import_report and url is not None:
+            report.write_json(ImportReport.get_json_path(url))
         return url
 
-    async def create_import_task(self, absolute_paths, export_folder, hoops_context):
+    def _open_source(file: Filepath, sources: SourceReader):
+        # Cannot Unzip directly from Nucleus, the archive is read in memory or through a temporary file
+        if not file.is_nucleus_path():
+            return nullcontext()
+        return sources.open(file.fullpath)
+
+    def _run_import_task(self, progress: ImportProgress, absolute_path, export_folder,
+                         converter_context: ConverterContext, current_nucleus_dir: str, sources: SourceReader):
+        # Each job extracts to its own temporary directory, removed even when the job fails or is cancelled
+        with progress.activate(), temp_workspace("import_"):
+            return self._create_import_task(absolute_path, export_folder, converter_context, current_nucleus_dir,
+                                            sources)
+
+    async def create_import_task(self, absolute_paths, export_folder, hoops_context,
+                                 progress_callback: ProgressCallback = None):
+        # The content browser is only queried from the UI thread, progress callbacks are called back on it
+        current_nucleus_dir = omni.kit.window.content_browser.get_content_window().get_current_directory()
+        loop = asyncio.get_event_loop()
+        progress = ImportProgress(ConverterHelper._call_from_loop(loop, progress_callback))
+        self._progress = progress
+        sources = SourceReader(hoops_context.source_memory_limit)
+        files: List[Filepath] = [ConverterHelper._get_filepath(x) for x in absolute_paths]
+        sources.prefetch([x.fullpath for x in files if x.is_nucleus_path()])
         converted_assets = {}
-        for i in range(len(absolute_paths)):
-            converted_assets[absolute_paths[i]] = self._create_import_task(absolute_paths[i], export_folder,
-                                                                           hoops_context)
-        shutil.rmtree(GLTFImporter.TMP_ARCHIVE_EXTRACT_DIR)
+        try:
+            for absolute_path in absolute_paths:
+                if progress.is_cancelled():
+                    break
+                converted_assets[absolute_path] = await loop.run_in_executor(
+                    self._executor, self._run_import_task, progress, absolute_path, export_folder, hoops_context,
+                    current_nucleus_dir, sources)
+        finally:
+            self._progress = None
+            sources.close()
         return converted_assets
+
+    def _call_from_loop(loop: asyncio.AbstractEventLoop, callback: ProgressCallback) -> ProgressCallback:
+        if callback is None:
+            return None
+        return lambda *args: loop.call_soon_threadsafe(callback, *args)
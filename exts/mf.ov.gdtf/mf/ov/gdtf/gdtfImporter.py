@@ -1,48 +1,104 @@
-from io import BytesIO
 import logging
-from typing import List
+from typing import BinaryIO, List
 import xml.etree.ElementTree as ET
 from zipfile import ZipFile
 
 from pxr import Gf, Sdf, Usd, UsdGeom
 
+from .archiveIndex import ArchiveIndex
+from .conversionCache import ConversionCache
 from .filepathUtility import Filepath
 from .gdtfUtil import Model, Geometry, Beam, FixtureAttributes
 from .gltfImporter import GLTFImporter
+from .importProgress import ImportCancelled, report_progress
+from .importReport import ImportReport, report_count, report_file_written, report_span, report_spec
+from .nestedArchive import NestedArchive
 from .USDTools import USDTools
 
 
 class GDTFImporter:
-    def convert(file: Filepath, output_dir: str, output_ext: str = ".usd") -> str:
+    def convert(file: Filepath, output_dir: str, output_ext: str = ".usd", cache: ConversionCache = None,
+                source: BinaryIO = None) -> str:
+        # source: the archive already opened, read from Nucleus, file only names the outputs
         try:
-            with ZipFile(file.fullpath, 'r') as archive:
-                gdtf_output_dir = output_dir + file.filename + "_gdtf/"
-                url: str = GDTFImporter._convert(archive, gdtf_output_dir, file.filename, output_ext)
-                return url
+            gdtf_output_dir = output_dir + file.filename + "_gdtf/"
+            with report_spec(file.filename):
+                if cache is not None:
+                    if source is not None:
+                        cache_key: str = cache.get_key_from_stream(source, output_ext)
+                        source.seek(0)
+                    else:
+                        cache_key: str = cache.get_key_from_file(file.fullpath, output_ext)
+                    url: str = cache.restore(cache_key, gdtf_output_dir, file.filename, output_ext)
+                    if url is not None:
+                        report_count("cache_hits")
+                        return url
+
+                with ZipFile(source if source is not None else file.fullpath, 'r') as archive:
+                    url: str = GDTFImporter._convert(archive, gdtf_output_dir, file.filename, output_ext)
 
+                if cache is not None:
+                    cache.store(cache_key, gdtf_output_dir, file.filename, output_ext)
+            return url
+
+        except ImportCancelled:
+            logger = logging.getLogger(__name__)
+            logger.info(f"Import of {file.fullpath} cancelled")
+            return None
         except Exception as e:
             logger = logging.getLogger(__name__)
             logger.error(f"Failed to parse gdtf file at {file.fullpath}. Make sure it is not corrupt. {e}")
             return None
 
-    def convert_from_mvr(spec_name: str, output_dir: str, mvr_archive: ZipFile, output_ext: str = ".usd") -> bool:
+    def convert_from_mvr(spec_name: str, output_dir: str, mvr_archive: ZipFile, output_ext: str = ".usd",
+                         cache: ConversionCache = None) -> bool:
         spec_name_with_ext = spec_name + ".gdtf"
-        if spec_name_with_ext in mvr_archive.namelist():
-            gdtf_data = BytesIO(mvr_archive.read(spec_name_with_ext))
+        if ArchiveIndex.get_shared(mvr_archive).contains(spec_name_with_ext):
             gdtf_output_dir = output_dir + spec_name + "_gdtf/"
-            with ZipFile(gdtf_data) as gdtf_archive:
-                GDTFImporter._convert(gdtf_archive, gdtf_output_dir, spec_name, output_ext)
-                return True
+            with report_spec(spec_name):
+                if cache is not None:
+                    with mvr_archive.open(spec_name_with_ext) as gdtf_stream:
+                        cache_key: str = cache.get_key_from_stream(gdtf_stream, output_ext)
+                    if cache.restore(cache_key, gdtf_output_dir, spec_name, output_ext) is not None:
+                        report_count("cache_hits")
+                        return True
+
+                # The nested gdtf is read in place when stored uncompressed in the mvr
+                with NestedArchive(mvr_archive, spec_name_with_ext) as gdtf_archive:
+                    GDTFImporter._convert(gdtf_archive, gdtf_output_dir, spec_name, output_ext)
+
+                if cache is not None:
+                    cache.store(cache_key, gdtf_output_dir, spec_name, output_ext)
+            return True
         else:
             return False
 
     def _convert(archive: ZipFile, output_dir: str, name: str, output_ext: str) -> str:
-        data = archive.read("description.xml")
-        root = ET.fromstring(data)
+        report_progress("parse", 0, 1, name)
+        with report_span("parse"):
+            data = archive.read("description.xml")
+            root = ET.fromstring(data)
         converted_models: List[Model] = GLTFImporter.convert(root, archive, output_dir)
-        url: str = GDTFImporter._convert_gdtf_usd(output_dir, name, output_ext, root, converted_models)
+        # The gdtf stage is saved after each authoring step, saves are part of the author phase
+        with report_span("author"):
+            url: str = GDTFImporter._convert_gdtf_usd(output_dir, name, output_ext, root, converted_models)
+        report_file_written(url)
         return url
 
+    def _count_authored_specs(layer: Sdf.Layer):
+        if ImportReport.get_active() is None:
+            return
+        counts = {"prims": 0, "attributes": 0}
+
+        def count_spec(path: Sdf.Path):
+            if path.IsPrimPath():
+                counts["prims"] += 1
+            elif path.IsPropertyPath() and layer.GetAttributeAtPath(path) is not None:
+                counts["attributes"] += 1
+        layer.Traverse(Sdf.Path.absoluteRootPath, count_spec)
+        report_count("prims", counts["prims"])
+        report_count("attributes", counts["attributes"])
+
     def _convert_gdtf_usd(output_dir: str, filename: str, ext: str, root: ET.Element, models: List[Model]) -> str:
         url: str = output_dir + filename + ext
         stage: Usd.Stage = GDTFImporter._get_or_create_gdtf_usd(url)
@@ -52,6 +108,7 @@ class GDTFImporter:
         GDTFImporter._add_light_to_hierarchy(stage, beams, geometries)
         GDTFImporter._apply_gltf_scale(stage, geometries)
         GDTFImporter._set_general_attributes(stage, root)
+        GDTFImporter._count_authored_specs(stage.GetRootLayer())
 
         return url
 
@@ -54,6 +54,7 @@ class Model:
         self._length = float(node.attrib["Length"])
         self._width = float(node.attrib["Width"])
         self._converted_from_3ds = False
+        self._archive_member = None
 
     def get_name(self) -> str:
         return self._name
@@ -61,12 +62,21 @@ class Model:
     def get_name_usd(self) -> str:
         return self._name_usd
 
+    def set_name_usd(self, name_usd: str):
+        self._name_usd = name_usd
+
     def has_file(self) -> bool:
         return self._file is not None and self._file != ""
 
     def get_file(self) -> str:
         return self._file
 
+    def set_archive_member(self, name: str):
+        self._archive_member = name
+
+    def get_archive_member(self) -> str:
+        return self._archive_member
+
     def set_tmpdir_filepath(self, path: Filepath):
         self._tmpdir_filepath = path
 
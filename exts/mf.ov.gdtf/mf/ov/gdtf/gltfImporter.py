@@ -1,33 +1,61 @@
+from contextlib import nullcontext
 import logging
 import omni.client
 import os
+import shutil
 import subprocess
-import tempfile
 from typing import List
 import xml.etree.ElementTree as ET
 from zipfile import ZipFile
 
+from .archiveIndex import ArchiveIndex
 from .filepathUtility import Filepath
 from .gdtfUtil import Model
+from .importProgress import report_progress
+from .importReport import report_count, report_span
+from .nameMapper import NameMapper
+from .tempWorkspace import temp_workspace
 
 
 class GLTFImporter:
-    TMP_ARCHIVE_EXTRACT_DIR = f"{tempfile.gettempdir()}/MF.OV.GDTF/"
+    WRITE_CHUNK_SIZE = 1024 * 1024  # Bytes read from the archive per write of a local model file
 
     def convert(root: ET.Element, archive: ZipFile, output_dir: str) -> List[Model]:
         models: List[Model] = GLTFImporter._get_model_nodes(root)
         models_filtered: List[Model] = GLTFImporter._filter_models(models)
-        GLTFImporter._extract_gltf_to_tmp(models_filtered, archive)
-        GLTFImporter._convert_gltf(models_filtered, output_dir)
+        GLTFImporter._find_model_members(models_filtered, archive)
+        models_3ds: List[Model] = [x for x in models_filtered if x.get_archive_member().endswith(".3ds")]
+        # Only 3ds models go through temporary files, the converter script reads and writes files.
+        # Specs commonly share model file names (base.3ds, yoke.3ds...), each conversion has its own directory
+        with temp_workspace("gdtf_") if len(models_3ds) > 0 else nullcontext() as tmp_dir:
+            with report_span("extract"):
+                GLTFImporter._convert_3ds_to_tmp(models_3ds, archive, tmp_dir)
+            # Last cancellation point of a gdtf conversion, nothing is written to the output directory until here
+            report_progress("copy", 0, 1)
+            with report_span("copy"):
+                GLTFImporter._convert_gltf(models_filtered, archive, output_dir)
+        report_count("models", len(models_filtered))
         return models
 
+    def get_model_files(root: ET.Element, archive: ZipFile) -> List[str]:
+        # Archive members the conversion would use for each model, without extracting them
+        files: List[str] = []
+        for model in GLTFImporter._filter_models(GLTFImporter._get_model_nodes(root)):
+            member: str = GLTFImporter._find_model_member(archive, model.get_file())
+            if member is not None:
+                files.append(member)
+        return files
+
     def _get_model_nodes(root: ET.Element) -> List[Model]:
         node_fixture: ET.Element = root.find("FixtureType")
         node_models: ET.Element = node_fixture.find("Models")
         nodes_model = node_models.findall("Model")
         models: List[Model] = []
+        names = NameMapper()  # Model prims can be siblings
         for node_model in nodes_model:
-            models.append(Model(node_model))
+            model = Model(node_model)
+            model.set_name_usd(names.get_name(model.get_name(), key=id(model)))
+            models.append(model)
         return models
 
     def _filter_models(models: List[Model]) -> List[Model]:
@@ -41,32 +69,26 @@ class GLTFImporter:
                 logger.info(f"File attribute empty for model node {model.get_name()}, skipping.")
         return filtered_models
 
-    def _extract_gltf_to_tmp(models: List[Model], gdtf_archive: ZipFile):
-        namelist = gdtf_archive.namelist()
+    def _find_model_member(gdtf_archive: ZipFile, filename: str) -> str:
+        # Archive member of a model file, None when missing. The File attribute of some fixtures differs in case
+        # from the archive member, it is matched case insensitively when no member has the exact name
+        candidates = [f"models/gltf/{filename}.glb", f"models/gltf/{filename}.gltf", f"models/3ds/{filename}.3ds"]
+        index: ArchiveIndex = ArchiveIndex.get_shared(gdtf_archive)
+        found = [x for x in candidates if index.contains(x)]
+        if len(found) > 0:
+            return found[0]
+        index = ArchiveIndex.get_shared(gdtf_archive, case_sensitive=False)
+        found = [index.get_name(x) for x in candidates if index.contains(x)]
+        return found[0] if len(found) > 0 else None
+
+    def _find_model_members(models: List[Model], gdtf_archive: ZipFile):
         to_remove: List[Model] = []
 
         for model in models:
             filename = model.get_file()
-            filepath_glb = f"models/gltf/{filename}.glb"
-            filepath_gltf = f"models/gltf/{filename}.gltf"
-            filepath_3ds = f"models/3ds/{filename}.3ds"
-
-            if filepath_glb in namelist:
-                tmp_export_path = gdtf_archive.extract(filepath_glb, GLTFImporter.TMP_ARCHIVE_EXTRACT_DIR)
-                model.set_tmpdir_filepath(Filepath(tmp_export_path))
-            elif filepath_gltf in namelist:
-                tmp_export_path = gdtf_archive.extract(filepath_gltf, GLTFImporter.TMP_ARCHIVE_EXTRACT_DIR)
-                for filepath in namelist:  # Also import .bin, textures, etc.
-                    if filepath.startswith(f"models/gltf/{filename}") and filepath != filepath_gltf:
-                        gdtf_archive.extract(filepath, GLTFImporter.TMP_ARCHIVE_EXTRACT_DIR)
-                model.set_tmpdir_filepath(Filepath(tmp_export_path))
-            elif filepath_3ds in namelist:
-                tmp_export_path = gdtf_archive.extract(filepath_3ds, GLTFImporter.TMP_ARCHIVE_EXTRACT_DIR)
-                temp_export_path_gltf = tmp_export_path[:-4] + ".gltf"
-                GLTFImporter._convert_3ds_to_gltf(tmp_export_path, temp_export_path_gltf)
-                model.set_tmpdir_filepath(Filepath(temp_export_path_gltf))
-                model.set_converted_from_3ds()
-                os.remove(tmp_export_path)
+            member: str = GLTFImporter._find_model_member(gdtf_archive, filename)
+            if member is not None:
+                model.set_archive_member(member)
             else:
                 logger = logging.getLogger(__name__)
                 logger.warn(f"No file found for {filename}, skipping.")
@@ -75,6 +97,17 @@ class GLTFImporter:
         for model in to_remove:
             models.remove(model)
 
+    def _convert_3ds_to_tmp(models: List[Model], gdtf_archive: ZipFile, tmp_dir: str):
+        for i, model in enumerate(models):
+            report_progress("extract", i, len(models), model.get_file())
+            tmp_export_path = gdtf_archive.extract(model.get_archive_member(), tmp_dir)
+            temp_export_path_gltf = tmp_export_path[:-4] + ".gltf"
+            with report_span("3ds"):
+                GLTFImporter._convert_3ds_to_gltf(tmp_export_path, temp_export_path_gltf)
+            model.set_tmpdir_filepath(Filepath(temp_export_path_gltf))
+            model.set_converted_from_3ds()
+            os.remove(tmp_export_path)
+
     def _convert_3ds_to_gltf(input, output):
         path = __file__
         my_env = os.environ.copy()
@@ -89,7 +122,7 @@ class GLTFImporter:
             logger = logging.getLogger(__name__)
             logger.error(f"Failed to convert 3ds file to gltf: {input}\n{e}")
 
-    def _convert_gltf(models: List[Model], gdtf_output_dir):
+    def _convert_gltf(models: List[Model], gdtf_archive: ZipFile, gdtf_output_dir):
         output_dir = gdtf_output_dir + "gltf/"
         _, files_in_output_dir = omni.client.list(output_dir)  # Ignoring omni.client.Result
         relative_paths_in_output_dir = [x.relative_path for x in files_in_output_dir]
@@ -97,19 +130,31 @@ class GLTFImporter:
         converted_models: List[Model] = []
 
         for model in models:
-            file: Filepath = model.get_tmpdir_filepath()
             if model.get_converted_from_3ds():
+                file: Filepath = model.get_tmpdir_filepath()
                 bin_file = file.basename[:-5] + ".bin"
                 bin_path = output_dir + bin_file
                 if bin_file not in relative_paths_in_output_dir:
                     input_path = file.fullpath[:-5] + ".bin"
                     result = result = omni.client.copy(input_path, bin_path, omni.client.CopyBehavior.OVERWRITE)
+                    GLTFImporter._count_copy(input_path, result)
+                input_path = file.fullpath
+                output_file = file.basename
+            else:
+                # glTF and glb models are streamed from the archive to their destination, never extracted
+                input_path = model.get_archive_member()
+                output_file = os.path.basename(input_path)
 
-            output_file = file.basename
             output_path = output_dir + output_file
             if output_file not in relative_paths_in_output_dir:
-                input_path = file.fullpath
-                result = omni.client.copy(input_path, output_path, omni.client.CopyBehavior.OVERWRITE)
+                if model.get_converted_from_3ds():
+                    result = omni.client.copy(input_path, output_path, omni.client.CopyBehavior.OVERWRITE)
+                    GLTFImporter._count_copy(input_path, result)
+                else:
+                    result = GLTFImporter._write_member(gdtf_archive, input_path, output_path)
+                    if result == omni.client.Result.OK and input_path.endswith(".gltf"):
+                        result = GLTFImporter._write_gltf_files(gdtf_archive, input_path, output_dir,
+                                                                relative_paths_in_output_dir)
                 if result == omni.client.Result.OK:
                     model.set_converted_filepath(Filepath(output_path))
                     converted_models.append(model)
@@ -120,3 +165,42 @@ class GLTFImporter:
                 model.set_converted_filepath(Filepath(output_path))
                 converted_models.append(model)
         return converted_models
+
+    def _write_member(archive: ZipFile, member: str, output_path: str) -> omni.client.Result:
+        # Local files are written chunk by chunk, omni.client.write_file takes the whole content for Nucleus
+        if Filepath(output_path).is_nucleus_path():
+            result = omni.client.write_file(output_path, archive.read(member))
+        else:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with archive.open(member) as source, open(output_path, "wb") as destination:
+                shutil.copyfileobj(source, destination, GLTFImporter.WRITE_CHUNK_SIZE)
+            result = omni.client.Result.OK
+        if result == omni.client.Result.OK:
+            report_count("copies")
+            report_count("bytes_written", archive.getinfo(member).file_size)
+        return result
+
+    def _write_gltf_files(gdtf_archive: ZipFile, gltf_member: str, output_dir: str,
+                          relative_paths_in_output_dir: List[str]) -> omni.client.Result:
+        # Buffers and textures named after a .gltf model, next to it or in a directory named after it,
+        # are written next to it keeping their relative paths
+        index: ArchiveIndex = ArchiveIndex.get_shared(gdtf_archive)
+        directory, _, gltf_file = gltf_member.rpartition("/")
+        name: str = gltf_file[:-5]
+        siblings = [x for x in index.get_names_in_directory(directory) if x.rpartition("/")[2].startswith(name)]
+        directory += "/"
+        for member in siblings + index.get_names_with_prefix(f"{directory}{name}/"):
+            if member.endswith((".gltf", ".glb")):
+                continue  # The model itself, or an other model whose name starts with its name
+            output_file: str = member[len(directory):]
+            if output_file in relative_paths_in_output_dir:
+                continue
+            result = GLTFImporter._write_member(gdtf_archive, member, output_dir + output_file)
+            if result != omni.client.Result.OK:
+                return result
+        return omni.client.Result.OK
+
+    def _count_copy(input_path: str, result: omni.client.Result):
+        if result == omni.client.Result.OK:
+            report_count("copies")
+            report_count("bytes_written", os.path.getsize(input_path))
@@ -0,0 +1,64 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable
+
+# Phase, done, total and the name of the spec or layer being processed
+ProgressCallback = Callable[[str, int, int, str], None]
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+class ImportProgress:
+    # Progress of an import running in the background, cancelled from the UI thread.
+    # Progress points are cancellation points: importers only report progress where stopping leaves outputs usable
+    MIN_CALLBACK_INTERVAL = 0.1  # Seconds between two callbacks of the same phase and name, final ones always pass
+    _active: ContextVar = ContextVar("mf_ov_import_progress", default=None)
+
+    def __init__(self, callback: ProgressCallback = None):
+        self._callback = callback
+        self._cancelled = threading.Event()
+        self._last_step = None
+        self._last_callback_time = 0.0
+
+    def get_active() -> "ImportProgress":
+        # Progress of the import running in this context, None outside of a cancellable import
+        return ImportProgress._active.get()
+
+    @contextmanager
+    def activate(self):
+        token = ImportProgress._active.set(self)
+        try:
+            yield self
+        finally:
+            ImportProgress._active.reset(token)
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def update(self, phase: str, done: int, total: int, name: str = ""):
+        if self._cancelled.is_set():
+            raise ImportCancelled()
+        if self._callback is None:
+            return
+        now = time.perf_counter()
+        step = (phase, name)
+        throttled: bool = now - self._last_callback_time < ImportProgress.MIN_CALLBACK_INTERVAL
+        if step == self._last_step and done < total and throttled:
+            return
+        self._last_step = step
+        self._last_callback_time = now
+        self._callback(phase, done, total, name)
+
+
+def report_progress(phase: str, done: int, total: int, name: str = ""):
+    # Raises ImportCancelled once the active import is cancelled, does nothing when no import is active
+    progress: ImportProgress = ImportProgress.get_active()
+    if progress is not None:
+        progress.update(phase, done, total, name)
@@ -0,0 +1,33 @@
+from typing import Callable
+
+import omni.ui as ui
+
+
+class ImportProgressWindow:
+    # Shown while an import runs in the background, updated from the UI thread only
+    def __init__(self, title: str, cancel_fn: Callable[[], None]):
+        self._cancel_fn = cancel_fn
+        self._progress_model = ui.SimpleFloatModel(0.0)
+        flags = ui.WINDOW_FLAGS_NO_RESIZE | ui.WINDOW_FLAGS_NO_SCROLLBAR | ui.WINDOW_FLAGS_NO_CLOSE
+        self._window = ui.Window(title, width=420, height=110, flags=flags)
+        with self._window.frame:
+            with ui.VStack(spacing=6):
+                self._label = ui.Label("Starting", height=20, elided_text=True)
+                ui.ProgressBar(self._progress_model, height=20)
+                self._cancel_button = ui.Button("Cancel", height=24, clicked_fn=self._on_cancel)
+
+    def update(self, phase: str, done: int, total: int, name: str):
+        step = f"{phase.capitalize()} {name}".strip()
+        self._label.text = f"{step} ({done}/{total})"
+        self._progress_model.set_value(done / total if total > 0 else 0.0)
+
+    def destroy(self):
+        if self._window is not None:
+            self._window.visible = False
+            self._window.destroy()
+            self._window = None
+
+    def _on_cancel(self):
+        self._label.text = "Cancelling"
+        self._cancel_button.enabled = False
+        self._cancel_fn()
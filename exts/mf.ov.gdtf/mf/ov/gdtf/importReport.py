@@ -0,0 +1,144 @@
+import json
+import logging
+import omni.client
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict
+
+from .filepathUtility import Filepath
+
+
+class ImportReport:
+    # Durations and counters of an import, in total and by gdtf spec.
+    # Phases may nest ("extract" includes "3ds"), durations of specs converted in parallel add up beyond wall time.
+    # Phases: parse, extract, 3ds, copy, author, save, gdtf. Counters: prims, attributes, copies, bytes_written...
+    _active: ContextVar = ContextVar("mf_ov_import_report", default=None)
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, float]] = {}  # Phase name: seconds and calls
+        self.counters: Dict[str, int] = {}
+        self.specs: Dict[str, Dict[str, object]] = {}  # Spec name: seconds, phases and counters
+        self._spec: str = None
+
+    def get_active() -> "ImportReport":
+        # Report of the import running in this context, None outside of an import
+        return ImportReport._active.get()
+
+    @contextmanager
+    def activate(self):
+        token = ImportReport._active.set(self)
+        try:
+            yield self
+        finally:
+            ImportReport._active.reset(token)
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            ImportReport._add_phase(self.phases, name, seconds, 1)
+            if self._spec is not None:
+                ImportReport._add_phase(self.specs[self._spec]["phases"], name, seconds, 1)
+
+    @contextmanager
+    def spec(self, name: str):
+        # Spans and counts within are also recorded under the spec
+        previous_spec = self._spec
+        self._spec = name
+        spec = self._get_spec(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            spec["seconds"] += time.perf_counter() - start
+            self._spec = previous_spec
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+        if self._spec is not None:
+            counters = self.specs[self._spec]["counters"]
+            counters[name] = counters.get(name, 0) + value
+
+    def merge(self, data: Dict[str, object]):
+        # Adds a report returned by to_dict, from a worker process
+        for name, phase in data["phases"].items():
+            ImportReport._add_phase(self.phases, name, phase["seconds"], phase["calls"])
+        for name, value in data["counters"].items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        for spec_name, spec_data in data["specs"].items():
+            spec = self._get_spec(spec_name)
+            spec["seconds"] += spec_data["seconds"]
+            for name, phase in spec_data["phases"].items():
+                ImportReport._add_phase(spec["phases"], name, phase["seconds"], phase["calls"])
+            for name, value in spec_data["counters"].items():
+                spec["counters"][name] = spec["counters"].get(name, 0) + value
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"phases": self.phases, "counters": self.counters, "specs": self.specs}
+
+    def write_json(self, url: str):
+        data = json.dumps(self.to_dict(), indent=2)
+        try:
+            if Filepath(url).is_nucleus_path():
+                result = omni.client.write_file(url, data.encode())
+                if result != omni.client.Result.OK:
+                    raise IOError(result)
+            else:
+                os.makedirs(os.path.dirname(url) or ".", exist_ok=True)
+                with open(url, "w") as f:
+                    f.write(data)
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.warn(f"Failed to write the import report {url}. {e}")
+
+    def get_json_path(stage_url: str) -> str:
+        # Written next to the output stage: "scene.usd" reports to "scene.report.json"
+        return os.path.splitext(stage_url)[0] + ".report.json"
+
+    def _get_spec(self, name: str) -> Dict[str, object]:
+        if name not in self.specs:
+            self.specs[name] = {"seconds": 0.0, "phases": {}, "counters": {}}
+        return self.specs[name]
+
+    def _add_phase(phases: Dict[str, Dict[str, float]], name: str, seconds: float, calls: int):
+        phase = phases.setdefault(name, {"seconds": 0.0, "calls": 0})
+        phase["seconds"] += seconds
+        phase["calls"] += calls
+
+
+@contextmanager
+def report_span(name: str):
+    # Spans and counts are dropped when no report is active
+    report: ImportReport = ImportReport.get_active()
+    if report is None:
+        yield
+    else:
+        with report.span(name):
+            yield
+
+
+@contextmanager
+def report_spec(name: str):
+    report: ImportReport = ImportReport.get_active()
+    if report is None:
+        yield
+    else:
+        with report.spec(name):
+            yield
+
+
+def report_count(name: str, value: int = 1):
+    report: ImportReport = ImportReport.get_active()
+    if report is not None:
+        report.count(name, value)
+
+
+def report_file_written(url: str):
+    # Counts the bytes of a written local file, sizes on Nucleus are not queried
+    if not Filepath(url).is_nucleus_path() and os.path.isfile(url):
+        report_count("bytes_written", os.path.getsize(url))
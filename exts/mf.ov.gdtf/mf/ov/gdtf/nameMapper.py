@@ -0,0 +1,45 @@
+from typing import Dict, Hashable, Set
+
+from pxr import Tf
+from unidecode import unidecode
+
+
+class NameMapper:
+    # Valid USD identifiers for the children of one prim. Different names can sanitize to the same identifier
+    # ("Layer 1" and "Layer-1"), later ones get a numbered suffix instead of silently merging into the same prim.
+    # Layer, spec and model names repeat across imports, fixture names are unique and would fill the cache:
+    # it is cleared when full, names still in use are cached again on their next lookup
+    MAX_CACHED_NAMES = 16384
+    _valid_names: Dict[str, str] = {}
+
+    def __init__(self):
+        self._names: Dict[Hashable, str] = {}
+        self._taken: Set[str] = set()
+
+    def make_name_valid(name: str) -> str:
+        identifier = NameMapper._valid_names.get(name)
+        if identifier is None:
+            valid_name = "_" + name if name[:1].isdigit() else name
+            if not valid_name.isascii():  # Transliteration is only needed outside of ascii
+                valid_name = unidecode(valid_name)
+            identifier = Tf.MakeValidIdentifier(valid_name)
+            if len(NameMapper._valid_names) >= NameMapper.MAX_CACHED_NAMES:
+                NameMapper._valid_names.clear()
+            NameMapper._valid_names[name] = identifier
+        return identifier
+
+    def get_name(self, name: str, key: Hashable = None) -> str:
+        # The same key, name by default, always maps to the same identifier
+        key = name if key is None else key
+        identifier = self._names.get(key)
+        if identifier is None:
+            identifier = NameMapper.make_name_valid(name)
+            if identifier in self._taken:
+                base = identifier
+                index = 1
+                while identifier in self._taken:
+                    identifier = f"{base}_{index}"
+                    index += 1
+            self._taken.add(identifier)
+            self._names[key] = identifier
+        return identifier
@@ -0,0 +1,108 @@
+import io
+import mmap
+import os
+import struct
+from zipfile import ZipFile, ZipInfo, ZIP_STORED
+
+
+class FileWindow(io.RawIOBase):
+    # Read-only view on [offset, offset + length) of a seekable source, a file or a memory map
+    def __init__(self, source, offset: int, length: int):
+        self._source = source
+        self._offset = offset
+        self._length = length
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._length + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._length - self._position)
+        if size <= 0:
+            return 0
+        self._source.seek(self._offset + self._position)
+        data = self._source.read(size)
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+class NestedArchive:
+    # Opens an archive stored inside another one, a gdtf inside an mvr.
+    # Stored members are read in place through a window on the outer file, memory mapped where possible.
+    # Deflated members, or outer archives not backed by a file, are buffered in memory.
+    LOCAL_HEADER_FORMAT = "<4s5H3L2H"
+    LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+    def __init__(self, archive: ZipFile, name: str):
+        self._archive = archive
+        self._name = name
+        self._file = None
+        self._mmap = None
+        self._nested = None
+
+    def __enter__(self) -> ZipFile:
+        info: ZipInfo = self._archive.getinfo(self._name)
+        window = None
+        if info.compress_type == ZIP_STORED and self._is_file_backed():
+            window = self._open_window(info)
+        if window is None:
+            window = io.BytesIO(self._archive.read(self._name))
+        self._nested = ZipFile(window, "r")
+        return self._nested
+
+    def __exit__(self, *_):
+        if self._nested is not None:
+            self._nested.close()
+            self._nested = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _is_file_backed(self) -> bool:
+        filename = self._archive.filename
+        return filename is not None and os.path.isfile(filename)
+
+    def _open_window(self, info: ZipInfo) -> FileWindow:
+        self._file = open(self._archive.filename, "rb")
+        # The central directory does not give the local header size, its extra field can differ
+        self._file.seek(info.header_offset)
+        header = self._file.read(struct.calcsize(NestedArchive.LOCAL_HEADER_FORMAT))
+        fields = struct.unpack(NestedArchive.LOCAL_HEADER_FORMAT, header)
+        if fields[0] != NestedArchive.LOCAL_HEADER_SIGNATURE:
+            self._file.close()
+            self._file = None
+            return None
+        name_length, extra_length = fields[9], fields[10]
+        data_offset = info.header_offset + len(header) + name_length + extra_length
+
+        source = self._file
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            source = self._mmap
+        except (OSError, ValueError):
+            pass  # Reading through the file handle instead
+        return FileWindow(source, data_offset, info.file_size)
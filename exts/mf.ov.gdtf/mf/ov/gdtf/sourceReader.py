@@ -0,0 +1,100 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+import io
+import os
+import tempfile
+import threading
+from typing import BinaryIO, Dict, List, Tuple
+
+import omni.client
+
+
+class SourceReadError(Exception):
+    pass
+
+
+class SourceReader:
+    # Reads archives from Nucleus without staging a copy in the temp directory.
+    # Sources up to memory_limit bytes are read in memory, larger ones are copied to a temporary file deleted once read.
+    # Requested sources are fetched several at once while the previous ones are converted
+    FETCH_WORKERS = 4
+    MAX_FETCHES = FETCH_WORKERS + 1  # Sources fetching or fetched and not opened yet, the next ones wait
+
+    def __init__(self, memory_limit: int):
+        self._memory_limit = memory_limit  # Bytes
+        self._executor = ThreadPoolExecutor(max_workers=SourceReader.FETCH_WORKERS,
+                                            thread_name_prefix="mf.ov.gdtf.source")
+        self._lock = threading.Lock()
+        self._pending: List[str] = []  # Requested, not fetched yet
+        self._fetches: Dict[str, Future] = {}
+
+    def prefetch(self, urls: List[str]):
+        with self._lock:
+            for url in urls:
+                if url not in self._fetches and url not in self._pending:
+                    self._pending.append(url)
+            self._submit_pending()
+
+    @contextmanager
+    def open(self, url: str) -> BinaryIO:
+        # Waits for the source to be fetched, raises SourceReadError when it cannot be read
+        with self._lock:
+            if url not in self._fetches:
+                if url in self._pending:
+                    self._pending.remove(url)
+                self._submit(url)
+            future: Future = self._fetches.pop(url)
+            self._submit_pending()
+        stream, spill_path = future.result()
+        try:
+            yield stream
+        finally:
+            SourceReader._release(stream, spill_path)
+
+    def close(self):
+        # Sources never opened are released once their fetch completes, pending ones are not fetched
+        with self._lock:
+            self._pending.clear()
+            for future in self._fetches.values():
+                future.cancel()
+                future.add_done_callback(SourceReader._release_fetch)
+            self._fetches.clear()
+        self._executor.shutdown(wait=False)
+
+    def _submit_pending(self):
+        while len(self._pending) > 0 and len(self._fetches) < SourceReader.MAX_FETCHES:
+            self._submit(self._pending.pop(0))
+
+    def _submit(self, url: str):
+        self._fetches[url] = self._executor.submit(SourceReader._fetch, url, self._memory_limit)
+
+    def _fetch(url: str, memory_limit: int) -> Tuple[BinaryIO, str]:
+        result, entry = omni.client.stat(url)
+        if result != omni.client.Result.OK:
+            raise SourceReadError(f"Could not read {url}: {result}")
+        if entry.size <= memory_limit:
+            result, _, content = omni.client.read_file(url)
+            if result != omni.client.Result.OK:
+                raise SourceReadError(f"Could not read {url}: {result}")
+            return io.BytesIO(memoryview(content)), None
+
+        # Copied without going through memory, to a named file: ZipFile and worker processes reopen it by path
+        fd, spill_path = tempfile.mkstemp(prefix="mf_ov_source_", suffix=os.path.splitext(url)[1])
+        os.close(fd)
+        try:
+            result = omni.client.copy(url, spill_path, omni.client.CopyBehavior.OVERWRITE)
+            if result != omni.client.Result.OK:
+                raise SourceReadError(f"Could not read {url}: {result}")
+            return open(spill_path, "rb"), spill_path
+        except Exception:
+            os.remove(spill_path)
+            raise
+
+    def _release(stream: BinaryIO, spill_path: str):
+        stream.close()
+        if spill_path is not None:
+            os.remove(spill_path)
+
+    def _release_fetch(future: Future):
+        if not future.cancelled() and future.exception() is None:
+            SourceReader._release(*future.result())
@@ -0,0 +1,25 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import os
+import shutil
+import tempfile
+
+TMP_ROOT_DIR = f"{tempfile.gettempdir()}/MF.OV.GDTF/"
+
+_active: ContextVar = ContextVar("mf_ov_temp_workspace", default=None)
+
+
+@contextmanager
+def temp_workspace(prefix: str):
+    # Yields a new directory, ending with a slash, removed with its content on exit.
+    # Created inside the workspace active in this context, an import job, or directly in TMP_ROOT_DIR:
+    # concurrent imports and specs converted at once never extract to the same directory
+    parent: str = _active.get() or TMP_ROOT_DIR
+    os.makedirs(parent, exist_ok=True)
+    path: str = tempfile.mkdtemp(prefix=prefix, dir=parent) + "/"
+    token = _active.set(path)
+    try:
+        yield path
+    finally:
+        _active.reset(token)
+        shutil.rmtree(path, ignore_errors=True)
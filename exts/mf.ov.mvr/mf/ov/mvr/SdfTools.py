@@ -0,0 +1,106 @@
+from typing import List
+from urllib.parse import unquote
+
+from pxr import Gf, Sdf, UsdGeom
+
+from .gdtfStageCache import GDTFStageCache, GDTFStageInfo
+from .USDTools import USDTools
+
+
+class SdfTools:
+    # Layer level counterpart of USDTools: authors specs directly, without a stage composing every edit
+    def get_or_create_layer(url: str) -> Sdf.Layer:
+        layer: Sdf.Layer = Sdf.Layer.FindOrOpen(url)
+        if layer is not None:
+            return layer
+
+        layer = Sdf.Layer.CreateNew(url)
+        layer.pseudoRoot.SetInfo(UsdGeom.Tokens.metersPerUnit, UsdGeom.LinearUnits.centimeters)  # TODO get user defaults
+        layer.pseudoRoot.SetInfo(UsdGeom.Tokens.upAxis, UsdGeom.Tokens.y)  # TODO get user defaults
+        SdfTools.define_prim(layer, Sdf.Path("/World"), "Xform")
+        layer.defaultPrim = "World"
+        return layer
+
+    def get_meters_per_unit(layer: Sdf.Layer) -> float:
+        if layer.pseudoRoot.HasInfo(UsdGeom.Tokens.metersPerUnit):
+            return layer.pseudoRoot.GetInfo(UsdGeom.Tokens.metersPerUnit)
+        return UsdGeom.LinearUnits.centimeters
+
+    def get_applied_scale(layer: Sdf.Layer, scale_factor: float) -> float:
+        return scale_factor / SdfTools.get_meters_per_unit(layer)
+
+    def get_default_prim_path(layer: Sdf.Layer) -> Sdf.Path:
+        return Sdf.Path.absoluteRootPath.AppendChild(layer.defaultPrim)
+
+    def define_prim(layer: Sdf.Layer, path: Sdf.Path, type_name: str) -> Sdf.PrimSpec:
+        prim_spec: Sdf.PrimSpec = Sdf.CreatePrimInLayer(layer, path)
+        prim_spec.specifier = Sdf.SpecifierDef
+        prim_spec.typeName = type_name
+        return prim_spec
+
+    def add_scope(layer: Sdf.Layer, name: str) -> Sdf.PrimSpec:
+        scope_path: Sdf.Path = SdfTools.get_default_prim_path(layer).AppendPath(name)
+        return SdfTools.define_prim(layer, scope_path, "Scope")
+
+    def add_fixture_xform(layer: Sdf.Layer, scope: Sdf.PrimSpec, name: str) -> Sdf.PrimSpec:
+        return SdfTools.define_prim(layer, scope.path.AppendPath(name), "Xform")
+
+    def add_instanceable_child(layer: Sdf.Layer, xform: Sdf.PrimSpec, name: str) -> Sdf.PrimSpec:
+        child: Sdf.PrimSpec = SdfTools.define_prim(layer, xform.path.AppendPath(name), "Xform")
+        child.instanceable = True
+        return child
+
+    def remove_prim(layer: Sdf.Layer, path: Sdf.Path):
+        prim_spec: Sdf.PrimSpec = layer.GetPrimAtPath(path)
+        if prim_spec is not None:
+            del prim_spec.nameParent.nameChildren[prim_spec.name]
+
+    def set_attribute(prim_spec: Sdf.PrimSpec, attribute_name: str, attribute_type: Sdf.ValueTypeNames, attribute_value,
+                      custom: bool = False, variability: Sdf.Variability = Sdf.VariabilityVarying):
+        attribute: Sdf.AttributeSpec = prim_spec.attributes.get(attribute_name)
+        if attribute is None:
+            attribute = Sdf.AttributeSpec(prim_spec, attribute_name, attribute_type, variability, custom)
+        attribute.default = attribute_value
+
+    def set_fixture_attribute(prim_spec: Sdf.PrimSpec, attribute_name: str, attribute_type: Sdf.ValueTypeNames,
+                              attribute_value):
+        SdfTools.set_attribute(prim_spec, f"mf:mvr:{attribute_name}", attribute_type, attribute_value, custom=True)
+
+    def set_xform_ops(prim_spec: Sdf.PrimSpec, translation: Gf.Vec3d, rotation: Gf.Vec3f):
+        # Same ops and precision as UsdGeom.Xform AddTranslateOp and AddRotateZYXOp, previous op order is replaced
+        SdfTools.set_attribute(prim_spec, "xformOp:translate", Sdf.ValueTypeNames.Double3, translation)
+        SdfTools.set_attribute(prim_spec, "xformOp:rotateZYX", Sdf.ValueTypeNames.Float3, rotation)
+        SdfTools.set_attribute(prim_spec, UsdGeom.Tokens.xformOpOrder, Sdf.ValueTypeNames.TokenArray,
+                               ["xformOp:translate", "xformOp:rotateZYX"], variability=Sdf.VariabilityUniform)
+
+    def add_scale_op(prim_spec: Sdf.PrimSpec, scale_value: Gf.Vec3d):
+        SdfTools.set_attribute(prim_spec, "xformOp:scale", Sdf.ValueTypeNames.Float3, Gf.Vec3f(scale_value))
+        xform_op_order: Sdf.AttributeSpec = prim_spec.attributes.get(UsdGeom.Tokens.xformOpOrder)
+        op_names: List[str] = list(xform_op_order.default) if xform_op_order is not None else []
+        if "xformOp:scale" not in op_names:
+            op_names.append("xformOp:scale")
+        SdfTools.set_attribute(prim_spec, UsdGeom.Tokens.xformOpOrder, Sdf.ValueTypeNames.TokenArray, op_names,
+                               variability=Sdf.VariabilityUniform)
+
+    def add_reference(layer: Sdf.Layer, ref_path_relative: str, stage_path: Sdf.Path, payload: bool = False):
+        # A fixture composes its gdtf stage through a single arc, switching modes replaces the other one
+        prim_spec: Sdf.PrimSpec = layer.GetPrimAtPath(stage_path)
+        path_unquoted = unquote(ref_path_relative)
+        if payload:
+            if prim_spec.hasReferences:
+                prim_spec.ClearReferenceList()
+            prim_spec.payloadList.Prepend(Sdf.Payload(path_unquoted))
+        else:
+            if prim_spec.hasPayloads:
+                prim_spec.ClearPayloadList()
+            prim_spec.referenceList.Prepend(Sdf.Reference(path_unquoted))
+
+    def get_gdtf_scale(mvr_layer: Sdf.Layer, relative_path: str, cache: GDTFStageCache) -> Gf.Vec3d:
+        # Same as USDTools.get_gdtf_scale, from the mvr layer rather than from its stage
+        gdtf_info: GDTFStageInfo = cache.get(USDTools.get_gdtf_stage_path(mvr_layer, relative_path))
+        gdtf_scale = gdtf_info.get_scale()
+        if gdtf_scale is not None:
+            return gdtf_scale
+
+        scale_factor = 1 / SdfTools.get_meters_per_unit(mvr_layer)
+        return Gf.Vec3d(scale_factor, scale_factor, scale_factor)
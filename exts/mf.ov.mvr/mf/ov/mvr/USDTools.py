@@ -1,18 +1,18 @@
 import numpy as np
-from typing import List
-from unidecode import unidecode
+from typing import List, Tuple
 from urllib.parse import unquote
 
-from pxr import Gf, Tf, Sdf, Usd, UsdGeom
+from pxr import Gf, Sdf, Usd, UsdGeom
+from mf.ov.gdtf.nameMapper import NameMapper
+
+from .gdtfStageCache import GDTFStageCache, GDTFStageInfo
 
 
 class USDTools:
     def make_name_valid(name: str) -> str:
-        if name[:1].isdigit():
-            name = "_" + name
-        return Tf.MakeValidIdentifier(unidecode(name))
+        return NameMapper.make_name_valid(name)
 
-    def get_or_create_stage(url: str) -> Usd.Stage:
+    def get_or_create_stage(url: str, save: bool = True) -> Usd.Stage:
         try:  # TODO: Better way to check if stage exists?
             return Usd.Stage.Open(url)
         except:
@@ -21,7 +21,8 @@ class USDTools:
             UsdGeom.SetStageUpAxis(stage, UsdGeom.Tokens.y)  # TODO get user defaults
             default_prim = stage.DefinePrim("/World", "Xform")
             stage.SetDefaultPrim(default_prim)
-            stage.Save()
+            if save:
+                stage.Save()
             return stage
 
     def add_scope(stage: Usd.Stage, name: str) -> UsdGeom.Scope:
@@ -35,6 +36,13 @@ class USDTools:
         xform: UsdGeom.Xform = UsdGeom.Xform.Define(stage, path)
         return xform
 
+    def add_instanceable_child(stage: Usd.Stage, xform: UsdGeom.Xform, name: str) -> UsdGeom.Xform:
+        path = xform.GetPath().AppendPath(name)
+        child: UsdGeom.Xform = UsdGeom.Xform.Define(stage, path)
+        child.GetPrim().SetInstanceable(True)
+        child.ClearXformOpOrder()  # Local op order, the scale op is added after the reference brings its own
+        return child
+
     def get_applied_scale(stage: Usd.Stage, scale_factor: float) -> float:
         stage_scale = UsdGeom.GetStageMetersPerUnit(stage)
         return scale_factor / stage_scale
@@ -60,38 +68,166 @@ class USDTools:
         )
         return gf_matrix
 
+    def np_matrices_from_mvr(values: List[str]) -> np.ndarray:
+        # Batch version of np_matrix_from_mvr, parses every matrix at once into a (N, 4, 3) array
+        # A fixture without matrix is placed at the origin (identity)
+        identity = "{1,0,0}{0,1,0}{0,0,1}{0,0,0}"
+        if len(values) == 0:
+            return np.zeros((0, 4, 3))
+        value_alt = ",".join([x if x is not None else identity for x in values])
+        value_alt = value_alt.replace("}{", ",").replace("{", "").replace("}", "")
+        return np.array(value_alt.split(","), dtype=np.float64).reshape(-1, 4, 3)
+
+    def transforms_from_mvr(np_matrices: np.ndarray, scale: float) -> Tuple[np.ndarray, np.ndarray]:
+        # Batch version of gf_matrix_from_mvr, ExtractRotation, Decompose(X, Y, Z) and the Z-up to Y-up change
+        # Returns (N, 3) translations and (N, 3) euler angles in degrees for a rotateZYX op
+        rotation = np_matrices[:, :3, :3]
+        norms = np.linalg.norm(rotation, axis=2, keepdims=True)
+        rotation = rotation / np.where(norms == 0, 1, norms)  # Ignore the matrix scale
+        rotation = np.where((norms == 0).any(axis=1, keepdims=True), np.identity(3),
+                            USDTools.orthonormalize_rotations(rotation))
+
+        # Same convention as Gf.Rotation.Decompose(X, Y, Z): the row vector matrix is Rz * Ry * Rx
+        cos_y = np.hypot(rotation[:, 0, 0], rotation[:, 1, 0])
+        not_gimbal_locked = cos_y > 1e-6
+        x = np.where(not_gimbal_locked, np.arctan2(0.0 - rotation[:, 2, 1], rotation[:, 2, 2]),
+                     np.arctan2(rotation[:, 1, 2], rotation[:, 1, 1]))
+        y = np.arctan2(rotation[:, 2, 0], cos_y)
+        z = np.where(not_gimbal_locked, np.arctan2(0.0 - rotation[:, 1, 0], rotation[:, 0, 0]), 0)
+        euler = np.degrees(np.stack([x, y, z], axis=1))
+        translation = np_matrices[:, 3, :] * scale
+
+        # Z-up to Y-up, same as multiplying by a -90 degrees rotation on the X axis: (x, y, z) -> (x, z, -y)
+        # Adding 0.0 turns -0.0 into 0.0, as the Gf matrix product does
+        y_up = np.array([1, 1, -1])
+        return translation[:, [0, 2, 1]] * y_up + 0.0, euler[:, [0, 2, 1]] * y_up + 0.0
+
+    def orthonormalize_rotations(rotations: np.ndarray) -> np.ndarray:
+        # (N, 3, 3) row vector matrices with normalized rows to the rotations they are closest to, through a
+        # normalized quaternion. MVR matrices written with a few decimals are not exactly orthonormal, and near
+        # gimbal lock the decomposition would amplify the rounding of the single elements it reads
+        count = len(rotations)
+        rows = np.arange(count)
+        diagonal = np.stack([rotations[:, 0, 0], rotations[:, 1, 1], rotations[:, 2, 2]], axis=1)
+        trace = diagonal.sum(axis=1)
+
+        # Real part first, derived from the trace, or from the largest diagonal element for angles close to 180
+        s = 2 * np.sqrt(np.maximum(1 + trace, 1e-12))
+        from_trace = np.stack([s / 4,
+                               (rotations[:, 1, 2] - rotations[:, 2, 1]) / s,
+                               (rotations[:, 2, 0] - rotations[:, 0, 2]) / s,
+                               (rotations[:, 0, 1] - rotations[:, 1, 0]) / s], axis=1)
+        i = diagonal.argmax(axis=1)
+        j, k = (i + 1) % 3, (i + 2) % 3
+        s = 2 * np.sqrt(np.maximum(1 + diagonal[rows, i] - diagonal[rows, j] - diagonal[rows, k], 1e-12))
+        from_diagonal = np.empty((count, 4))
+        from_diagonal[:, 0] = (rotations[rows, j, k] - rotations[rows, k, j]) / s
+        from_diagonal[rows, i + 1] = s / 4
+        from_diagonal[rows, j + 1] = (rotations[rows, i, j] + rotations[rows, j, i]) / s
+        from_diagonal[rows, k + 1] = (rotations[rows, k, i] + rotations[rows, i, k]) / s
+
+        quaternions = np.where((trace > 0)[:, None], from_trace, from_diagonal)
+        w, x, y, z = (quaternions / np.linalg.norm(quaternions, axis=1, keepdims=True)).T
+        return np.stack([
+            np.stack([1 - 2 * (y * y + z * z), 2 * (x * y + z * w), 2 * (z * x - y * w)], axis=1),
+            np.stack([2 * (x * y - z * w), 1 - 2 * (z * z + x * x), 2 * (y * z + x * w)], axis=1),
+            np.stack([2 * (z * x + y * w), 2 * (y * z - x * w), 1 - 2 * (y * y + x * x)], axis=1)], axis=1)
+
+    def quaternions_from_rotations(rotations: np.ndarray) -> np.ndarray:
+        # (N, 3) rotateZYX euler angles in degrees to (N, 4) quaternions, real part first
+        # Same rotation as the rotateZYX op: q = qx * qy * qz with the Gf (row vector) convention
+        half = np.radians(rotations) / 2
+        cos, sin = np.cos(half), np.sin(half)
+        cx, cy, cz = cos[:, 0], cos[:, 1], cos[:, 2]
+        sx, sy, sz = sin[:, 0], sin[:, 1], sin[:, 2]
+        return np.stack([cx * cy * cz - sx * sy * sz,
+                         sx * cy * cz + cx * sy * sz,
+                         cx * sy * cz - sx * cy * sz,
+                         cx * cy * sz + sx * sy * cz], axis=1)
+
+    def add_point_instancer(stage: Usd.Stage, scope: UsdGeom.Scope, name: str) -> UsdGeom.PointInstancer:
+        path = scope.GetPath().AppendPath(name)
+        instancer: UsdGeom.PointInstancer = UsdGeom.PointInstancer.Define(stage, path)
+        return instancer
+
+    def add_prototype(stage: Usd.Stage, instancer: UsdGeom.PointInstancer, name: str) -> UsdGeom.Xform:
+        # Prototypes live under the instancer, they are only drawn through its instances
+        prototypes_scope: UsdGeom.Scope = UsdGeom.Scope.Define(stage, instancer.GetPath().AppendPath("Prototypes"))
+        path = prototypes_scope.GetPath().AppendPath(name)
+        xform: UsdGeom.Xform = UsdGeom.Xform.Define(stage, path)
+        instancer.GetPrototypesRel().AddTarget(path)
+        return xform
+
+    def set_fixture_primvar(instancer: UsdGeom.PointInstancer, primvar_name: str, primvar_type: Sdf.ValueTypeNames,
+                            primvar_value, interpolation: str = UsdGeom.Tokens.vertex):
+        primvars_api = UsdGeom.PrimvarsAPI(instancer)
+        primvar = primvars_api.CreatePrimvar(f"mf:mvr:{primvar_name}", primvar_type, interpolation)
+        primvar.Set(primvar_value)
+
     def set_fixture_attribute(prim: Usd.Prim, attribute_name: str, attribute_type: Sdf.ValueTypeNames, attribute_value):
         prim.CreateAttribute(f"mf:mvr:{attribute_name}", attribute_type).Set(attribute_value)
 
-    def add_reference(stage: Usd.Stage, ref_path_relative: str, stage_path: str):
-        xform_ref: UsdGeom.Xform = stage.GetPrimAtPath(stage_path)
+    def add_reference(stage: Usd.Stage, ref_path_relative: str, stage_path: str, save: bool = True,
+                      payload: bool = False):
+        # Payloads are only composed once loaded, transforms and attributes of the prim are available before
+        xform_ref: Usd.Prim = stage.GetPrimAtPath(stage_path)
         path_unquoted = unquote(ref_path_relative)
-        references: Usd.References = xform_ref.GetReferences()
-        references.AddReference(path_unquoted)
-        stage.Save()
+        if payload:
+            if xform_ref.HasAuthoredReferences():
+                xform_ref.GetReferences().ClearReferences()
+            xform_ref.GetPayloads().AddPayload(path_unquoted)
+        else:
+            if xform_ref.HasAuthoredPayloads():
+                xform_ref.GetPayloads().ClearPayloads()
+            references: Usd.References = xform_ref.GetReferences()
+            references.AddReference(path_unquoted)
+        if save:
+            stage.Save()
 
-    def copy_gdtf_scale(mvr_stage: Usd.Stage, stage_prim_path: str, relative_path: str):
+    def copy_gdtf_scale(mvr_stage: Usd.Stage, stage_prim_path: str, relative_path: str, save: bool = True,
+                        cache: GDTFStageCache = None):
         # Copy a reference default prim scale op value to a referencing xform in an other stage
-        curr_root_layer = mvr_stage.GetRootLayer()
-        curr_stage_url: str = curr_root_layer.realPath
+        scale_value: Gf.Vec3d = USDTools.get_gdtf_scale(mvr_stage, relative_path, cache)
+        USDTools.set_scale(mvr_stage, stage_prim_path, scale_value)
+        if save:
+            mvr_stage.Save()
+
+    def get_gdtf_scale(mvr_stage: Usd.Stage, relative_path: str, cache: GDTFStageCache = None) -> Gf.Vec3d:
+        if cache is None:
+            cache = GDTFStageCache(max_size=1)
+        gdtf_info: GDTFStageInfo = cache.get(USDTools.get_gdtf_stage_path(mvr_stage.GetRootLayer(), relative_path))
+        gdtf_scale = gdtf_info.get_scale()
+        if gdtf_scale is not None:
+            return gdtf_scale
+
+        stage_scale = UsdGeom.GetStageMetersPerUnit(mvr_stage)
+        scale_factor = 1 / stage_scale
+        return Gf.Vec3d(scale_factor, scale_factor, scale_factor)
+
+    def get_gdtf_stage_path(mvr_layer: Sdf.Layer, relative_path: str) -> str:
+        curr_stage_url: str = mvr_layer.realPath
         curr_stage_url_formatted: str = curr_stage_url.replace('\\', '/')
         curr_stage_dir_index: str = curr_stage_url_formatted.rindex("/")
         curr_stage_dir = curr_stage_url_formatted[:curr_stage_dir_index]
 
-        mvr_xform_target = UsdGeom.Xform(mvr_stage.GetPrimAtPath(stage_prim_path))
-
         gdtf_stage_filename: str = relative_path[1:]
         gdtf_stage_path: str = curr_stage_dir + gdtf_stage_filename
-        gdtf_stage: Usd.Stage = Usd.Stage.Open(gdtf_stage_path)
-        gdtf_default_prim = UsdGeom.Xform(gdtf_stage.GetDefaultPrim())
-
-        stage_scale = UsdGeom.GetStageMetersPerUnit(mvr_stage)
-        scale_factor = 1 / stage_scale
-        scale_value = Gf.Vec3d(scale_factor, scale_factor, scale_factor)
-        xform_ordered_ops: List[UsdGeom.XformOp] = gdtf_default_prim.GetOrderedXformOps()
-        for xform_op in xform_ordered_ops:
-            if xform_op.GetOpType() == UsdGeom.XformOp.TypeScale:
-                scale_value = xform_op.Get()
-
-        mvr_xform_target.AddScaleOp().Set(scale_value)
-        mvr_stage.Save()
+        return gdtf_stage_path
+
+    def set_scale(stage: Usd.Stage, stage_prim_path: str, scale_value: Gf.Vec3d):
+        xform_target = UsdGeom.Xform(stage.GetPrimAtPath(stage_prim_path))
+        xform_target.AddScaleOp().Set(scale_value)
+
+    def load_fixtures_in_region(stage: Usd.Stage, region: Gf.Range3d) -> int:
+        # Loads the gdtf payloads of the fixtures placed in region, in stage units, on a stage opened with LoadNone.
+        # Fixture transforms are on the unloaded xforms, children of the layer scopes. Point instancers load as a whole
+        xform_cache = UsdGeom.XformCache()
+        to_load: List[Sdf.Path] = []
+        for scope in stage.GetDefaultPrim().GetChildren():
+            for fixture in scope.GetAllChildren():  # Unloaded prims are filtered out of GetChildren
+                if fixture.IsA(UsdGeom.Xform):
+                    position: Gf.Vec3d = xform_cache.GetLocalToWorldTransform(fixture).ExtractTranslation()
+                    if region.Contains(position):
+                        to_load.append(fixture.GetPath())
+        stage.LoadAndUnload(to_load, [])
+        return len(to_load)
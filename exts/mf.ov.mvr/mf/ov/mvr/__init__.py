@@ -6,4 +6,9 @@ pluginsRoot = os.path.join(os.path.dirname(__file__), '../../../plugin/resources
 Plug.Registry().RegisterPlugins(pluginsRoot)
 
 
-from .extension import *
+try:
+    import omni.ext  # noqa: F401
+except ImportError:
+    pass  # Imported outside of Kit, by the batch converter: the importers are used without the extension
+else:
+    from .extension import *
@@ -0,0 +1,90 @@
+import asyncio
+from contextlib import contextmanager, nullcontext
+import contextvars
+import time
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+from pxr import Sdf
+
+
+class AuthoringScheduler:
+    # Authors fixtures on the event loop thread, which owns the stages open in Kit, in batches fitting a frame budget.
+    # The import thread waits for each authoring pass while the loop yields a frame between batches
+    _active: contextvars.ContextVar = contextvars.ContextVar("mf_ov_authoring_scheduler", default=None)
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, frame_budget: float,
+                 next_frame: Callable[[], Awaitable] = None):
+        self._loop = loop
+        self._frame_budget = frame_budget  # Seconds
+        self._next_frame = next_frame if next_frame is not None else lambda: asyncio.sleep(0)
+        self.stats: Dict[str, Dict[str, float]] = {}  # Pass name: fixtures, frames and seconds
+
+    def get_active() -> "AuthoringScheduler":
+        return AuthoringScheduler._active.get()
+
+    @contextmanager
+    def activate(self):
+        token = AuthoringScheduler._active.set(self)
+        try:
+            yield self
+        finally:
+            AuthoringScheduler._active.reset(token)
+
+    def author(self, name: str, items: Sequence, author_fn: Callable, change_block: bool = False) -> List:
+        # Returns the results of author_fn for each item, in order
+        try:
+            on_loop_thread: bool = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop_thread = False
+        if on_loop_thread:  # Waiting for the loop from its own thread would never return
+            return _author_all(items, author_fn, change_block)
+
+        context = contextvars.copy_context()  # Progress and report of the import stay active on the loop thread
+        batches = self._author_batches(name, items, author_fn, change_block, context)
+        return asyncio.run_coroutine_threadsafe(batches, self._loop).result()
+
+    def get_fixtures_per_second(self, name: str) -> float:
+        stats: Dict[str, float] = self.stats.get(name)
+        if stats is None or stats["seconds"] == 0:
+            return 0.0
+        return stats["fixtures"] / stats["seconds"]
+
+    async def _author_batches(self, name: str, items: Sequence, author_fn: Callable, change_block: bool,
+                              context: contextvars.Context) -> List:
+        results: List = []
+        frames = 0
+        batch_size: int = len(items)
+        start = time.perf_counter()
+        while len(results) < len(items):
+            frame_start = time.perf_counter()
+            batch_end: int = min(len(items), len(results) + batch_size)
+            batch_start: int = len(results)
+            with Sdf.ChangeBlock() if change_block else nullcontext():
+                while len(results) < batch_end:
+                    results.append(context.run(author_fn, items[len(results)]))
+                    if time.perf_counter() - frame_start >= self._frame_budget:
+                        break
+            # Closing the change block recomposes the stage: the next batch is sized on the whole cost of this one
+            elapsed: float = time.perf_counter() - frame_start
+            batch_size = max(1, int((len(results) - batch_start) * self._frame_budget / elapsed))
+            frames += 1
+            await self._next_frame()
+
+        stats: Dict[str, float] = self.stats.setdefault(name, {"fixtures": 0, "frames": 0, "seconds": 0.0})
+        stats["fixtures"] += len(items)
+        stats["frames"] += frames
+        stats["seconds"] += time.perf_counter() - start  # Frames yielded to Kit included
+        return results
+
+
+def schedule_authoring(name: str, items: Sequence, author_fn: Callable, change_block: bool = False) -> List:
+    # Authors every item at once in the calling thread when no scheduler is active
+    scheduler: AuthoringScheduler = AuthoringScheduler.get_active()
+    if scheduler is None:
+        return _author_all(items, author_fn, change_block)
+    return scheduler.author(name, items, author_fn, change_block)
+
+
+def _author_all(items: Sequence, author_fn: Callable, change_block: bool) -> List:
+    with Sdf.ChangeBlock() if change_block else nullcontext():
+        return [author_fn(x) for x in items]
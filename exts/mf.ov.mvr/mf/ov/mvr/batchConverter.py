@@ -0,0 +1,177 @@
+"""
+Converts MVR and GDTF files to USD without Kit, files of the given directories are found recursively.
+
+Requires pxr and omni.client (Kit's bundled python or the Omniverse client library), no Kit UI module is imported.
+Both extensions must be importable:
+    PYTHONPATH=exts/mf.ov.mvr:exts/mf.ov.gdtf python -m mf.ov.mvr.batchConverter shows/ -o converted/ --workers 8
+    python -m mf.ov.mvr.batchConverter show.mvr fixture.gdtf -o converted/ --context sdf_authoring=True
+
+Each file is converted in its own worker process. The exit code is 1 when any conversion fails.
+"""
+import argparse
+import ast
+from concurrent.futures import as_completed
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from mf.ov.gdtf.conversionCache import ConversionCache
+from mf.ov.gdtf.gdtfImporter import GDTFImporter
+
+from .converterContext import ConverterContext
+from .filepathUtility import Filepath
+from .mvrImporter import MVRImporter
+from .processPool import create_process_pool
+
+SUPPORTED_EXTENSIONS = (".mvr", ".gdtf")
+
+
+class BatchJob:
+    def __init__(self, source: str, output_dir: str):
+        self.source = source
+        self.output_dir = output_dir  # The importer creates "<name>_mvr/" or "<name>_gdtf/" in it
+        self.url: str = None
+        self.seconds: float = 0.0
+        self.errors: List[str] = []
+
+    def succeeded(self) -> bool:
+        # Errors logged while a stage is still written (a model failing to convert) fail the job as well
+        return self.url is not None and len(self.errors) == 0
+
+
+class ErrorCollector(logging.Handler):
+    # Importers log their failures instead of raising, they are kept for the summary
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.messages.append(record.getMessage())
+
+
+class BatchConverter:
+    def find_jobs(paths: List[str], output_dir: str) -> List[BatchJob]:
+        # Files found in a directory keep their relative directory under output_dir, names can repeat across folders
+        jobs: List[BatchJob] = []
+        for path in paths:
+            if os.path.isdir(path):
+                for dirpath, dirnames, filenames in os.walk(path):
+                    dirnames.sort()
+                    relative_dir = os.path.relpath(dirpath, path)
+                    job_output_dir = output_dir if relative_dir == "." else os.path.join(output_dir, relative_dir)
+                    for filename in sorted(filenames):
+                        if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                            jobs.append(BatchJob(os.path.join(dirpath, filename), job_output_dir))
+            elif os.path.isfile(path):
+                jobs.append(BatchJob(path, output_dir))
+            else:
+                raise FileNotFoundError(f"No file or directory at {path}")
+        return jobs
+
+    def convert(jobs: List[BatchJob], output_ext: str, context_values: Dict[str, object], workers: int):
+        if workers <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                BatchConverter._update_job(job, _convert_job(job.source, job.output_dir, output_ext, context_values))
+                BatchConverter._log_job(job)
+            return
+
+        # Each gdtf conversion extracts to its own temporary directory, workers never share one
+        with create_process_pool(min(workers, len(jobs))) as pool:
+            futures = {pool.submit(_convert_job, job.source, job.output_dir, output_ext, context_values): job
+                       for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    BatchConverter._update_job(job, future.result())
+                except Exception as e:  # The worker process died
+                    job.errors.append(str(e))
+                BatchConverter._log_job(job)
+
+    def get_summary(jobs: List[BatchJob], seconds: float) -> str:
+        failed: List[BatchJob] = [x for x in jobs if not x.succeeded()]
+        lines: List[str] = [f"{len(jobs) - len(failed)} converted, {len(failed)} failed, in {seconds:.1f}s"]
+        for job in failed:
+            lines.append(f"FAILED {job.source}")
+            lines += [f"    {x}" for x in job.errors]
+        return "\n".join(lines)
+
+    def _update_job(job: BatchJob, result: Tuple[str, float, List[str]]):
+        job.url, job.seconds, job.errors = result
+
+    def _log_job(job: BatchJob):
+        logger = logging.getLogger(__name__)
+        if job.succeeded():
+            logger.info(f"Converted {job.source} to {job.url} in {job.seconds:.1f}s")
+        else:
+            logger.error(f"Failed to convert {job.source}")
+
+
+def _convert_job(source: str, output_dir: str, output_ext: str,
+                 context_values: Dict[str, object]) -> Tuple[str, float, List[str]]:
+    # Returns the converted stage url, None on failure, the duration and the errors logged by the importer
+    collector = ErrorCollector()
+    logging.getLogger().addHandler(collector)
+    start = time.perf_counter()
+    url: str = None
+    try:
+        output_dir = output_dir.replace("\\", "/").rstrip("/") + "/"
+        os.makedirs(output_dir, exist_ok=True)
+        file = Filepath(source.replace("\\", "/"))
+        context = ConverterContext()
+        for key, value in context_values.items():
+            setattr(context, key, value)
+        if file.ext.lower() == ".gdtf":
+            cache: ConversionCache = None
+            if context.gdtf_conversion_cache_dir is not None:
+                cache = ConversionCache(context.gdtf_conversion_cache_dir, context.gdtf_conversion_cache_max_size)
+            url = GDTFImporter.convert(file, output_dir, output_ext, cache)
+        else:
+            url = MVRImporter.convert(file, output_dir, output_ext, context)
+    except Exception as e:
+        collector.messages.append(f"{type(e).__name__}: {e}")
+    finally:
+        logging.getLogger().removeHandler(collector)
+    return url, time.perf_counter() - start, collector.messages
+
+
+def _parse_context(values: List[str]) -> Dict[str, object]:
+    # key=value pairs set on ConverterContext, values are python literals
+    context: Dict[str, object] = {}
+    for value in values:
+        key, _, literal = value.partition("=")
+        if not hasattr(ConverterContext, key):
+            raise ValueError(f"Unknown ConverterContext attribute {key}")
+        context[key] = ast.literal_eval(literal)
+    return context
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m mf.ov.mvr.batchConverter", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="MVR and GDTF files, or directories searched recursively")
+    parser.add_argument("-o", "--output", required=True, help="Output directory")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="Files converted at once")
+    parser.add_argument("--usda", action="store_true", help="Write .usda stages instead of .usd")
+    parser.add_argument("--context", nargs="*", default=[], help="ConverterContext overrides, as key=value")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every conversion")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(levelname)s %(message)s")
+
+    try:
+        context_values = _parse_context(args.context)
+        jobs: List[BatchJob] = BatchConverter.find_jobs(args.paths, args.output)
+    except (ValueError, SyntaxError, FileNotFoundError) as e:
+        parser.error(str(e))
+    if len(jobs) == 0:
+        parser.error(f"No {' or '.join(SUPPORTED_EXTENSIONS)} file found")
+
+    start = time.perf_counter()
+    BatchConverter.convert(jobs, ".usda" if args.usda else ".usd", context_values, args.workers)
+    print(BatchConverter.get_summary(jobs, time.perf_counter() - start))
+    return 0 if all([x.succeeded() for x in jobs]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
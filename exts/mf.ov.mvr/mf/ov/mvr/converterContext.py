@@ -1,2 +1,27 @@
 class ConverterContext:
     usd_reference_path = ""
+    gdtf_workers = 1  # Number of processes converting GDTF specs, 1 converts them one after the other
+    deferred_save = False  # Save the mvr stage once, after every fixture has been authored
+    gdtf_stage_cache_size = 64  # Number of gdtf default prim scales cached while adding fixture references
+    gdtf_conversion_cache_dir = None  # Directory of the gdtf conversion cache shared across imports, None disables it
+    gdtf_conversion_cache_max_size = 2 * 1024 ** 3  # Bytes, least recently used entries are evicted above it
+    stream_scene_description = False  # Read GeneralSceneDescription.xml incrementally instead of loading the whole tree
+    stream_batch_size = 1000  # Number of fixture nodes held in memory at once when streaming
+    # Output modes: incremental, point_instancer, sublayers, sdf_authoring or a Usd.Stage when none is set.
+    # The first one set wins. incremental cannot combine with point_instancer or sublayers, point_instancer cannot
+    # combine with sublayers, sdf_authoring or instanceable_references: those are ignored with a warning.
+    # incremental and sublayers always author at the Sdf level. payloads and instanceable_references otherwise
+    # combine with every mode, deferred_save only applies to the Usd.Stage mode
+    sdf_authoring = False  # Author fixture prims directly in the mvr layer, without opening a Usd.Stage
+    instanceable_references = False  # Reference gdtf stages from an instanceable child of each fixture xform
+    point_instancer = False  # Author one PointInstancer per gdtf spec of a layer instead of one Xform per fixture
+    sublayers = False  # Author each MVR layer in its own sublayer "<mvr>_<layer>.usd", the root layer only lists them
+    sublayer_workers = 4  # Number of processes authoring the sublayers, 1 authors them one after the other
+    payloads = False  # Gdtf stages are payloads: open the mvr stage with Usd.Stage.LoadNone, load layers on demand
+    incremental = False  # Only author the fixtures changed since the previous import of the same mvr, at the Sdf level
+    import_summary = None  # Set by incremental imports, fixtures created, updated, removed and gdtf specs skipped
+    authoring_frame_budget = 0.008  # Seconds of fixture authoring per frame when importing from Kit, on the main thread
+    authoring_rates = None  # Set by imports authored on the main thread, fixtures per second of each authoring pass
+    source_memory_limit = 256 * 1024 ** 2  # Bytes, Nucleus sources larger than this are read through a temporary file
+    write_import_report = False  # Write the import report as JSON next to the output stage
+    import_report = None  # Set by each import, durations by phase and by gdtf spec, prims, attributes and bytes written
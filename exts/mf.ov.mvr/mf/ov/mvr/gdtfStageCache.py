@@ -0,0 +1,55 @@
+from collections import OrderedDict
+from typing import List
+
+from pxr import Gf, Sdf, UsdGeom
+
+
+class GDTFStageInfo:
+    def __init__(self, layer: Sdf.Layer):
+        # layer is None when the gdtf stage could not be opened (e.g. the spec failed to convert)
+        self._scale: Gf.Vec3f = None
+        if layer is not None:
+            self._scale = GDTFStageInfo._get_default_prim_scale(layer)
+
+    def get_scale(self) -> Gf.Vec3f:
+        # None when the default prim does not author a scale op
+        return self._scale
+
+    def _get_default_prim_scale(layer: Sdf.Layer) -> Gf.Vec3f:
+        # Read from the layer rather than a composed stage: the gdtf default prim authors its own xform ops
+        if not layer.defaultPrim:
+            return None
+        default_prim: Sdf.PrimSpec = layer.GetPrimAtPath(Sdf.Path.absoluteRootPath.AppendChild(layer.defaultPrim))
+        if default_prim is None:
+            return None
+
+        scale_value = None
+        op_names: List[str] = []
+        xform_op_order: Sdf.AttributeSpec = default_prim.attributes.get(UsdGeom.Tokens.xformOpOrder)
+        if xform_op_order is not None and xform_op_order.default is not None:
+            op_names = list(xform_op_order.default)
+        for op_name in op_names:
+            if op_name.split(":")[1:2] == ["scale"]:
+                op_attribute: Sdf.AttributeSpec = default_prim.attributes.get(op_name)
+                if op_attribute is not None and op_attribute.default is not None:
+                    scale_value = op_attribute.default
+        return scale_value
+
+
+class GDTFStageCache:
+    def __init__(self, max_size: int = 64):
+        self._max_size = max(1, max_size)
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, url: str) -> GDTFStageInfo:
+        info: GDTFStageInfo = self._entries.get(url)
+        if info is not None:
+            self._entries.move_to_end(url)
+            return info
+
+        layer: Sdf.Layer = Sdf.Layer.FindOrOpen(url)
+        info = GDTFStageInfo(layer)
+        self._entries[url] = info
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)  # Least recently used
+        return info
@@ -0,0 +1,109 @@
+import hashlib
+import omni.client
+from typing import Dict, List, Tuple
+from zipfile import ZipFile
+
+from pxr import Sdf
+from mf.ov.gdtf.archiveIndex import ArchiveIndex
+
+from .mvrUtil import Fixture
+
+
+class ImportSummary:
+    def __init__(self):
+        self.created: List[str] = []  # Fixture uuids
+        self.updated: List[str] = []
+        self.removed: List[str] = []
+        self.unchanged: List[str] = []
+        self.converted_specs: List[str] = []
+        self.skipped_specs: List[str] = []
+
+    def __str__(self) -> str:
+        return (f"{len(self.created)} fixtures created, {len(self.updated)} updated, {len(self.removed)} removed, "
+                f"{len(self.unchanged)} unchanged. {len(self.converted_specs)} gdtf specs converted, "
+                f"{len(self.skipped_specs)} skipped")
+
+
+class MVRDiff:
+    # Fingerprints of the previous import are stored in the mvr layer customLayerData:
+    # fixtures by uuid (fingerprint, stage path and spec), gdtf specs by archive hash and the authoring options
+    CUSTOM_DATA_KEY = "mf:mvr:incremental"
+
+    def __init__(self, layer: Sdf.Layer, options: str = ""):
+        data = layer.customLayerData.get(MVRDiff.CUSTOM_DATA_KEY, {})
+        self._previous_fixtures: Dict[str, Dict[str, str]] = dict(data.get("fixtures", {}))
+        self._previous_specs: Dict[str, str] = dict(data.get("gdtfSpecs", {}))
+        self._options_changed: bool = data.get("options", "") != options
+        self._options = options
+        self._fixtures: Dict[str, Dict[str, str]] = {}
+        self._specs: Dict[str, str] = {}
+        self.summary = ImportSummary()
+
+    def diff_specs(self, archive: ZipFile, gdtf_specs: List[str], output_dir: str, ext: str) -> List[str]:
+        # Returns the specs to convert, a spec is skipped when its archive is unchanged and its output still exists
+        to_convert: List[str] = []
+        for gdtf_spec in dict.fromkeys(gdtf_specs):
+            spec_hash: str = MVRDiff._get_spec_hash(archive, gdtf_spec)
+            if spec_hash is None:
+                to_convert.append(gdtf_spec)  # Missing from the archive, let the importer report it
+                continue
+            self._specs[gdtf_spec] = spec_hash
+            spec_url = f"{output_dir}{gdtf_spec}_gdtf/{gdtf_spec}{ext}"
+            if self._previous_specs.get(gdtf_spec) == spec_hash and MVRDiff._output_exists(spec_url):
+                self.summary.skipped_specs.append(gdtf_spec)
+            else:
+                self.summary.converted_specs.append(gdtf_spec)
+                to_convert.append(gdtf_spec)
+        return to_convert
+
+    def _output_exists(url: str) -> bool:
+        # Local and Nucleus outputs alike
+        result, _ = omni.client.stat(url)
+        return result == omni.client.Result.OK
+
+    def diff_fixtures(self, fixtures: List[Fixture]) -> Tuple[List[Fixture], List[Sdf.Path]]:
+        # Stage paths of the fixtures must be set. Returns the fixtures to author and the stage paths to remove
+        to_author: List[Fixture] = []
+        to_remove: List[Sdf.Path] = []
+        converted_specs = set(self.summary.converted_specs)
+        for fixture in fixtures:
+            uuid: str = fixture.get_uuid()
+            record: Dict[str, str] = {
+                "fingerprint": fixture.get_fingerprint(),
+                "path": str(fixture.get_stage_path()),
+                "spec": fixture.get_spec_name()
+            }
+            self._fixtures[uuid] = record
+            previous: Dict[str, str] = self._previous_fixtures.get(uuid)
+            if previous is None:
+                self.summary.created.append(uuid)
+                to_author.append(fixture)
+            elif previous == record and record["spec"] not in converted_specs and not self._options_changed:
+                self.summary.unchanged.append(uuid)
+            else:
+                # A reconverted spec can change the scale copied on the fixture, options change the hierarchy
+                self.summary.updated.append(uuid)
+                to_author.append(fixture)
+                if previous["path"] != record["path"]:
+                    to_remove.append(Sdf.Path(previous["path"]))
+
+        for uuid, previous in self._previous_fixtures.items():
+            if uuid not in self._fixtures:
+                self.summary.removed.append(uuid)
+                to_remove.append(Sdf.Path(previous["path"]))
+        return to_author, to_remove
+
+    def write(self, layer: Sdf.Layer):
+        data = layer.customLayerData
+        data[MVRDiff.CUSTOM_DATA_KEY] = {"fixtures": self._fixtures, "gdtfSpecs": self._specs, "options": self._options}
+        layer.customLayerData = data
+
+    def _get_spec_hash(archive: ZipFile, gdtf_spec: str) -> str:
+        spec_name_with_ext = gdtf_spec + ".gdtf"
+        if not ArchiveIndex.get_shared(archive).contains(spec_name_with_ext):
+            return None
+        hasher = hashlib.sha256()
+        with archive.open(spec_name_with_ext) as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
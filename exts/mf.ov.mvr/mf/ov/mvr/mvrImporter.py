@@ -1,51 +1,349 @@
+from concurrent.futures import as_completed
 import logging
 import numpy as np
-from typing import List, Tuple
+import os
+from typing import BinaryIO, Callable, Dict, List, Set, Tuple
 import xml.etree.ElementTree as ET
 from zipfile import ZipFile
 
-from pxr import Gf, Usd, UsdGeom
+from pxr import Gf, Sdf, Usd, UsdGeom, Vt
 from mf.ov.gdtf import gdtfImporter as gdtf
+from mf.ov.gdtf.conversionCache import ConversionCache
+from mf.ov.gdtf.importProgress import ImportCancelled, ImportProgress, report_progress
+from mf.ov.gdtf.importReport import ImportReport, report_count, report_file_written, report_span
+from mf.ov.gdtf.nameMapper import NameMapper
 
+from .authoringScheduler import schedule_authoring
+from .converterContext import ConverterContext
 from .filepathUtility import Filepath
+from .gdtfStageCache import GDTFStageCache
+from .mvrDiff import MVRDiff
+from .mvrPlanner import ImportPlan, MVRPlanner
+from .mvrReader import MVRSceneReader
 from .mvrUtil import Layer, Fixture
+from .outputSnapshot import OutputSnapshot
+from .processPool import create_process_pool
+from .SdfTools import SdfTools
 from .USDTools import USDTools
 
 
 class MVRImporter:
-    def convert(file: Filepath, mvr_output_dir: str, output_ext: str = ".usd") -> str:
+    INSTANCEABLE_CHILD_NAME = "GDTF"
+    # ConverterContext options selecting the output mode, the first one set wins
+    OUTPUT_MODES = ["incremental", "point_instancer", "sublayers", "sdf_authoring"]
+    # Options an output mode cannot combine with, ignored with a warning
+    IGNORED_OPTIONS = {
+        "incremental": ["point_instancer", "sublayers"],
+        "point_instancer": ["sublayers", "sdf_authoring", "instanceable_references"],
+    }
+
+    def convert(file: Filepath, mvr_output_dir: str, output_ext: str = ".usd", context: ConverterContext = None,
+                source: BinaryIO = None) -> str:
         # TODO:  change output_ext to bool use_usda
+        # source: the archive already opened, read from Nucleus, file only names the outputs
+        if context is None:
+            context = ConverterContext()
+        MVRImporter._warn_for_ignored_options(context)
+        report = ImportReport()
+        context.import_report = report
         try:
-            with ZipFile(file.fullpath, 'r') as archive:
+            with report.activate(), ZipFile(source if source is not None else file.fullpath, 'r') as archive:
                 output_dir = mvr_output_dir + file.filename + "_mvr/"
-                data = archive.read("GeneralSceneDescription.xml")
-                root = ET.fromstring(data)
-                MVRImporter._warn_for_version(root)
-                url: str = MVRImporter.convert_mvr_usd(output_dir, file.filename, output_ext, root, archive)
-                return url
+                report_progress("parse", 0, 1, file.filename)
+                if context.stream_scene_description:
+                    with report_span("parse"):
+                        layers: List[Layer] = MVRImporter._read_layers(archive, context.stream_batch_size)
+                    url: str = MVRImporter._convert_layers(output_dir, file.filename, output_ext, layers, archive,
+                                                           context)
+                else:
+                    with report_span("parse"):
+                        data = archive.read("GeneralSceneDescription.xml")
+                        root = ET.fromstring(data)
+                    MVRImporter._warn_for_version(root.attrib)
+                    url: str = MVRImporter.convert_mvr_usd(output_dir, file.filename, output_ext, root, archive,
+                                                           context)
+            if context.write_import_report and url is not None:
+                report.write_json(ImportReport.get_json_path(url))
+            return url
+        except ImportCancelled:
+            logger = logging.getLogger(__name__)
+            logger.info(f"Import of {file.fullpath} cancelled")
+            return None
         except Exception as e:
             logger = logging.getLogger(__name__)
             logger.error(f"Failed to parse mvr file at {file.fullpath}. Make sure it is not corrupt. {e}")
             return None
 
-    def _warn_for_version(root):
-        v_major = root.attrib["verMajor"]
-        v_minor = root.attrib["verMinor"]
+    def plan(file: Filepath, context: ConverterContext = None) -> ImportPlan:
+        # Dry run: unique gdtf specs with their fixture counts, missing specs and estimated work, nothing is written
+        if context is None:
+            context = ConverterContext()
+        with ZipFile(file.fullpath, 'r') as archive:
+            if context.stream_scene_description:
+                layers: List[Layer] = MVRImporter._read_layers(archive, context.stream_batch_size)
+            else:
+                root = ET.fromstring(archive.read("GeneralSceneDescription.xml"))
+                MVRImporter._warn_for_version(root.attrib)
+                layers: List[Layer] = MVRImporter._get_layers(root.find("Scene"))
+                for layer in layers:
+                    layer.find_fixtures()
+            MVRImporter._assign_usd_names(layers)
+            return MVRPlanner.plan(layers, archive)
+
+    def _warn_for_version(root_attrib: Dict[str, str]):
+        v_major = root_attrib["verMajor"]
+        v_minor = root_attrib["verMinor"]
         if v_major != "1" or v_minor != "5":
             logger = logging.getLogger(__name__)
             logger.warn(f"This extension is tested with mvr v1.5, this file version is {v_major}.{v_minor}")
 
-    def convert_mvr_usd(output_dir: str, filename: str, ext: str, root: ET.Element, archive: ZipFile) -> str:
-        scene: ET.Element = root.find("Scene")
-        layers: List[Layer] = MVRImporter._get_layers(scene)
-        for layer in layers:
-            layer.find_fixtures()
+    def _get_output_mode(context: ConverterContext) -> str:
+        # One of OUTPUT_MODES, "stage" when none is set
+        return next((x for x in MVRImporter.OUTPUT_MODES if getattr(context, x)), "stage")
+
+    def _warn_for_ignored_options(context: ConverterContext):
+        mode: str = MVRImporter._get_output_mode(context)
+        ignored: List[str] = [x for x in MVRImporter.IGNORED_OPTIONS.get(mode, []) if getattr(context, x)]
+        if len(ignored) > 0:
+            logger = logging.getLogger(__name__)
+            logger.warn(f"ConverterContext.{mode} is set, {', '.join(ignored)} cannot be combined with it and "
+                        f"{'is' if len(ignored) == 1 else 'are'} ignored")
+
+    def convert_mvr_usd(output_dir: str, filename: str, ext: str, root: ET.Element, archive: ZipFile,
+                        context: ConverterContext = None) -> str:
+        if context is None:
+            context = ConverterContext()
+        with report_span("parse"):
+            scene: ET.Element = root.find("Scene")
+            layers: List[Layer] = MVRImporter._get_layers(scene)
+            for layer in layers:
+                layer.find_fixtures()
+        return MVRImporter._convert_layers(output_dir, filename, ext, layers, archive, context)
+
+    def _convert_layers(output_dir: str, filename: str, ext: str, layers: List[Layer], archive: ZipFile,
+                        context: ConverterContext) -> str:
+        report_count("fixtures", sum([x.fixtures_len() for x in layers]))
+        MVRImporter._assign_usd_names(layers)
+        if ImportProgress.get_active() is None:
+            return MVRImporter._author_layers(output_dir, filename, ext, layers, archive, context)
+
+        # A cancelled import puts the layers it writes back as they were
+        snapshot = OutputSnapshot(MVRImporter._get_output_urls(output_dir, filename, ext, layers, context))
+        try:
+            return MVRImporter._author_layers(output_dir, filename, ext, layers, archive, context)
+        except ImportCancelled:
+            snapshot.restore()
+            raise
+        finally:
+            snapshot.discard()
 
-        stage, url = MVRImporter._make_mvr_stage(output_dir, filename, ext, layers)
-        MVRImporter._convert_gdtf(stage, layers, output_dir, archive, ext)
-        stage.Save()
+    def _author_layers(output_dir: str, filename: str, ext: str, layers: List[Layer], archive: ZipFile,
+                       context: ConverterContext) -> str:
+        mode: str = MVRImporter._get_output_mode(context)
+        if mode == "incremental":
+            return MVRImporter._convert_layers_incremental(output_dir, filename, ext, layers, archive, context)
+        if mode == "point_instancer":
+            return MVRImporter._convert_layers_instancer(output_dir, filename, ext, layers, archive, context)
+        if mode == "sublayers":
+            return MVRImporter._convert_layers_sublayers(output_dir, filename, ext, layers, archive, context)
+        if mode == "sdf_authoring":
+            return MVRImporter._convert_layers_sdf(output_dir, filename, ext, layers, archive, context)
+        with report_span("author"):
+            stage, url = MVRImporter._make_mvr_stage(output_dir, filename, ext, layers, context.deferred_save,
+                                                     context.instanceable_references)
+        MVRImporter._convert_gdtf(stage, layers, output_dir, archive, ext, context)
+        MVRImporter._save(stage.GetRootLayer())
         return url
 
+    def _get_output_urls(output_dir: str, filename: str, ext: str, layers: List[Layer],
+                         context: ConverterContext) -> List[str]:
+        urls: List[str] = [output_dir + filename + ext]
+        if MVRImporter._get_output_mode(context) == "sublayers":
+            sublayers: List[Layer] = [x for x in layers if x.fixtures_len() > 0]
+            urls += [MVRImporter._get_sublayer_url(output_dir, filename, ext, x) for x in sublayers]
+        return urls
+
+    def _get_sublayer_url(output_dir: str, filename: str, ext: str, mvr_layer: Layer) -> str:
+        return f"{output_dir}{filename}_{mvr_layer.get_name_usd()}{ext}"
+
+    def _save(layer: Sdf.Layer):
+        report_progress("save", 0, 1)
+        with report_span("save"):
+            layer.Save()
+        report_file_written(layer.realPath)
+
+    def _convert_layers_sdf(output_dir: str, filename: str, ext: str, layers: List[Layer], archive: ZipFile,
+                            context: ConverterContext) -> str:
+        # Fixture prims are authored as specs in the root layer, no stage recomposes the scene after each edit
+        url: str = output_dir + filename + ext
+        with report_span("author"):
+            layer: Sdf.Layer = SdfTools.get_or_create_layer(url)
+            MVRImporter._add_fixture_xform_sdf(layer, layers, context.instanceable_references)
+        gdtf_specs: List[str] = MVRImporter._get_gdtf_to_import(layers, archive, context)
+        MVRImporter._convert_gdtf_specs(gdtf_specs, output_dir, archive, ext, context)
+        fixtures: List[Fixture] = [x for mvr_layer in layers for x in mvr_layer.get_fixtures()]
+        with report_span("author"):
+            MVRImporter._add_gdtf_reference_sdf(fixtures, layer, ext, GDTFStageCache(context.gdtf_stage_cache_size),
+                                                context.payloads)
+        MVRImporter._save(layer)
+        return url
+
+    def _convert_layers_sublayers(output_dir: str, filename: str, ext: str, layers: List[Layer], archive: ZipFile,
+                                  context: ConverterContext) -> str:
+        # Each MVR layer is authored in its own sublayer, in parallel, the root layer only lists them.
+        # Gdtf specs are converted first: authoring a fixture reads the scale of its gdtf stage.
+        gdtf_specs: List[str] = MVRImporter._get_gdtf_to_import(layers, archive, context)
+        MVRImporter._convert_gdtf_specs(gdtf_specs, output_dir, archive, ext, context)
+
+        sublayers: List[Tuple[str, str, List[Fixture]]] = []
+        for mvr_layer in layers:
+            if mvr_layer.fixtures_len() > 0:
+                sublayer_url: str = MVRImporter._get_sublayer_url(output_dir, filename, ext, mvr_layer)
+                sublayers.append((sublayer_url, mvr_layer.get_name_usd(), mvr_layer.get_fixtures()))
+        MVRImporter._author_sublayers(sublayers, ext, context)
+
+        url: str = output_dir + filename + ext
+        with report_span("author"):
+            layer: Sdf.Layer = SdfTools.get_or_create_layer(url)
+            default_prim: Sdf.PrimSpec = layer.GetPrimAtPath(SdfTools.get_default_prim_path(layer))
+            scope_names: List[str] = [x[1] for x in sublayers]
+            with Sdf.ChangeBlock():
+                # Root layer opinions are stronger, scopes left by a single layer import would hide the sublayers
+                for scope_name in scope_names:
+                    SdfTools.remove_prim(layer, default_prim.path.AppendChild(scope_name))
+                default_prim.SetInfo("primOrder", scope_names)  # Sublayers would compose in reverse, keep the MVR order
+            layer.subLayerPaths = ["./" + os.path.basename(x[0]) for x in sublayers]
+        MVRImporter._save(layer)
+        return url
+
+    def _author_sublayers(sublayers: List[Tuple[str, str, List[Fixture]]], ext: str, context: ConverterContext):
+        # Authoring is bound by the cpu, more processes than cores only add their startup
+        workers: int = min(context.sublayer_workers, len(sublayers), os.cpu_count() or 1)
+        if workers <= 1:
+            for sublayer_url, scope_name, fixtures in sublayers:
+                report_progress("author", 0, len(fixtures), scope_name)
+                MVRImporter._author_sublayer(sublayer_url, scope_name, fixtures, ext, context.instanceable_references,
+                                             context.payloads, context.gdtf_stage_cache_size)
+            return
+
+        with create_process_pool(workers) as pool:
+            futures = {pool.submit(_author_sublayer_worker, sublayer_url, scope_name, fixtures, ext,
+                                   context.instanceable_references, context.payloads,
+                                   context.gdtf_stage_cache_size): scope_name
+                       for sublayer_url, scope_name, fixtures in sublayers}
+            try:
+                for i, future in enumerate(as_completed(futures)):
+                    worker_report: Dict[str, object] = future.result()  # A failed sublayer fails the import
+                    report: ImportReport = ImportReport.get_active()
+                    if report is not None:
+                        report.merge(worker_report)
+                    report_progress("author", i + 1, len(futures), futures[future])
+            except ImportCancelled:
+                pool.shutdown(cancel_futures=True)  # Sublayers being authored are completed, then restored
+                raise
+
+    def _author_sublayer(url: str, scope_name: str, fixtures: List[Fixture], ext: str, instanceable: bool,
+                         payload: bool, gdtf_stage_cache_size: int):
+        # The sublayer only holds the scope of its MVR layer, it is authored again from scratch
+        with report_span("author"):
+            layer: Sdf.Layer = SdfTools.get_or_create_layer(url)
+            mvr_scale = UsdGeom.LinearUnits.millimeters  # MVR dimensions are in millimeters
+            applied_scale: float = SdfTools.get_applied_scale(layer, mvr_scale)
+            with Sdf.ChangeBlock():
+                SdfTools.remove_prim(layer, SdfTools.get_default_prim_path(layer).AppendChild(scope_name))
+                MVRImporter._add_layer_fixtures_sdf(layer, scope_name, fixtures, applied_scale, instanceable)
+            MVRImporter._add_gdtf_reference_sdf(fixtures, layer, ext, GDTFStageCache(gdtf_stage_cache_size), payload)
+        MVRImporter._save(layer)
+
+    def _convert_layers_instancer(output_dir: str, filename: str, ext: str, layers: List[Layer], archive: ZipFile,
+                                  context: ConverterContext) -> str:
+        url: str = output_dir + filename + ext
+        stage: Usd.Stage = USDTools.get_or_create_stage(url, save=False)
+        gdtf_specs: List[str] = MVRImporter._get_gdtf_to_import(layers, archive, context)
+        MVRImporter._convert_gdtf_specs(gdtf_specs, output_dir, archive, ext, context)
+        with report_span("author"):
+            MVRImporter._add_point_instancers(stage, layers, ext, GDTFStageCache(context.gdtf_stage_cache_size),
+                                              context.payloads)
+        MVRImporter._save(stage.GetRootLayer())
+        return url
+
+    def _convert_layers_incremental(output_dir: str, filename: str, ext: str, layers: List[Layer], archive: ZipFile,
+                                    context: ConverterContext) -> str:
+        # Only the fixtures whose fingerprint changed since the previous import are authored again, at the Sdf level
+        url: str = output_dir + filename + ext
+        layer: Sdf.Layer = SdfTools.get_or_create_layer(url)
+        diff = MVRDiff(layer, MVRImporter._get_incremental_options(context))
+
+        gdtf_specs: List[str] = MVRImporter._get_gdtf_to_import(layers, archive, context)
+        with report_span("diff"):
+            gdtf_specs = diff.diff_specs(archive, gdtf_specs, output_dir, ext)
+        MVRImporter._convert_gdtf_specs(gdtf_specs, output_dir, archive, ext, context)
+
+        default_prim_path: Sdf.Path = SdfTools.get_default_prim_path(layer)
+        for mvr_layer in layers:
+            scope_path: Sdf.Path = default_prim_path.AppendPath(mvr_layer.get_name_usd())
+            for fixture in mvr_layer.get_fixtures():
+                fixture.set_stage_path(scope_path.AppendPath(fixture.get_unique_name_usd()))
+        fixtures: List[Fixture] = [x for mvr_layer in layers for x in mvr_layer.get_fixtures()]
+        with report_span("diff"):
+            to_author, to_remove = diff.diff_fixtures(fixtures)
+
+        with report_span("author"):
+            with Sdf.ChangeBlock():
+                # Updated fixtures are authored from scratch, no stale attribute is left behind
+                for path in to_remove + [x.get_stage_path() for x in to_author]:
+                    SdfTools.remove_prim(layer, path)
+                MVRImporter._remove_empty_scopes(layer, set([x.GetParentPath() for x in to_remove]))
+
+            authored = set([id(x) for x in to_author])
+            MVRImporter._add_fixture_xform_sdf(layer, layers, context.instanceable_references,
+                                               lambda fixture: id(fixture) in authored)
+            MVRImporter._add_gdtf_reference_sdf(to_author, layer, ext, GDTFStageCache(context.gdtf_stage_cache_size),
+                                                context.payloads)
+            diff.write(layer)
+        MVRImporter._save(layer)
+
+        context.import_summary = diff.summary
+        logger = logging.getLogger(__name__)
+        logger.info(f"Incremental import of {filename}: {diff.summary}")
+        return url
+
+    def _get_incremental_options(context: ConverterContext) -> str:
+        # Options changing the fixture hierarchy or its composition arcs, any change authors every fixture again
+        options: List[str] = []
+        if context.instanceable_references:
+            options.append("instanceable")
+        if context.payloads:
+            options.append("payloads")
+        return ",".join(options)
+
+    def _remove_empty_scopes(layer: Sdf.Layer, scope_paths: Set[Sdf.Path]):
+        for scope_path in scope_paths:
+            scope: Sdf.PrimSpec = layer.GetPrimAtPath(scope_path)
+            if scope is not None and len(scope.nameChildren) == 0:
+                SdfTools.remove_prim(layer, scope_path)
+
+    def _assign_usd_names(layers: List[Layer]):
+        # Layers, and fixtures of a layer, are siblings: names sanitizing to the same identifier must not merge prims
+        layer_names = NameMapper()
+        for layer in layers:
+            layer.set_name_usd(layer_names.get_name(layer.get_name(), key=id(layer)))
+            fixture_names = NameMapper()
+            for fixture in layer.get_fixtures():
+                name = f"{fixture.get_name()}_{fixture.get_uuid()}"
+                fixture.set_unique_name_usd(fixture_names.get_name(name, key=id(fixture)))
+
+    def _read_layers(archive: ZipFile, batch_size: int) -> List[Layer]:
+        layers: List[Layer] = []
+        with archive.open("GeneralSceneDescription.xml") as source:
+            reader = MVRSceneReader(source, batch_size)
+            for layer, fixtures in reader.read():
+                if len(layers) == 0 or layers[-1] is not layer:
+                    layers.append(layer)
+                layer.add_fixtures(fixtures)
+        MVRImporter._warn_for_version(reader.get_root_attrib())
+        return layers
+
     def _get_layers(scene: ET.Element) -> List[Layer]:
         layersNode: ET.Element = scene.find("Layers")
         layerNodes: ET.Element = layersNode.findall("Layer")
@@ -55,67 +353,287 @@ class MVRImporter:
             layers.append(layer)
         return layers
 
-    def _make_mvr_stage(output_dir: str, filename: str, ext: str, layers: List[Layer]) -> Tuple[Usd.Stage, str]:
+    def _make_mvr_stage(output_dir: str, filename: str, ext: str, layers: List[Layer],
+                        deferred_save: bool = False, instanceable: bool = False) -> Tuple[Usd.Stage, str]:
         url: str = output_dir + filename + ext
-        stage: Usd.Stage = USDTools.get_or_create_stage(url)
-        MVRImporter._add_fixture_xform(stage, layers)
+        stage: Usd.Stage = USDTools.get_or_create_stage(url, save=not deferred_save)
+        MVRImporter._add_fixture_xform(stage, layers, deferred_save, instanceable)
 
         return stage, url
 
-    def _add_fixture_xform(stage: Usd.Stage, layers: List[Layer]):
-        rotate_minus90deg_xaxis = Gf.Matrix3d(1, 0, 0, 0, 0, 1, 0, -1, 0)
+    def _add_fixture_xform(stage: Usd.Stage, layers: List[Layer], deferred_save: bool = False,
+                           instanceable: bool = False):
         mvr_scale = UsdGeom.LinearUnits.millimeters  # MVR dimensions are in millimeters
         applied_scale: float = USDTools.get_applied_scale(stage, mvr_scale)
 
         for layer in layers:
             if layer.fixtures_len() > 0:
                 scope: UsdGeom.Scope = USDTools.add_scope(stage, layer.get_name_usd())
-                for fixture in layer.get_fixtures():
+                fixtures: List[Fixture] = layer.get_fixtures()
+                # Every matrix of the layer is parsed and decomposed at once, Z-up to Y-up included
+                # TODO: Validate with stage up axis
+                np_matrices: np.ndarray = USDTools.np_matrices_from_mvr([x.get_matrix() for x in fixtures])
+                translations, rotations = USDTools.transforms_from_mvr(np_matrices, applied_scale)
+                transforms = list(enumerate(zip(fixtures, translations.tolist(), rotations.tolist())))
+
+                def add_fixture(item: Tuple[int, Tuple[Fixture, List[float], List[float]]]) -> int:
+                    i, (fixture, translation, rotate) = item
+                    report_progress("author", i, len(fixtures), layer.get_name())
                     xform: UsdGeom.Xform = USDTools.add_fixture_xform(stage, scope, fixture.get_unique_name_usd())
                     fixture.set_stage_path(xform.GetPrim().GetPath())
-                    np_matrix: np.matrix = USDTools.np_matrix_from_mvr(fixture.get_matrix())
-                    gf_matrix: Gf.Matrix4d = USDTools.gf_matrix_from_mvr(np_matrix, applied_scale)
-
-                    rotation: Gf.Rotation = gf_matrix.ExtractRotation()
-                    euler: Gf.Vec3d = rotation.Decompose(Gf.Vec3d.XAxis(), Gf.Vec3d.YAxis(), Gf.Vec3d.ZAxis())
-
-                    # Z-up to Y-up
-                    # TODO: Validate with stage up axis
-                    translation = rotate_minus90deg_xaxis * gf_matrix.ExtractTranslation()
-                    rotate = rotate_minus90deg_xaxis * euler
 
                     xform.ClearXformOpOrder()  # Prevent error when overwritting
-                    xform.AddTranslateOp().Set(translation)
-                    xform.AddRotateZYXOp().Set(rotate)
+                    xform.AddTranslateOp().Set(Gf.Vec3d(*translation))
+                    xform.AddRotateZYXOp().Set(Gf.Vec3f(*rotate))
                     # Scale Op is added in _add_gdtf_reference
 
-                    fixture.apply_attributes_to_prim(xform.GetPrim())
-        stage.Save()
+                    attribute_count: int = fixture.apply_attributes_to_prim(xform.GetPrim())
+                    if instanceable:
+                        # Fixtures of a spec share one prototype, transform and attributes stay on the parent
+                        child = USDTools.add_instanceable_child(stage, xform, MVRImporter.INSTANCEABLE_CHILD_NAME)
+                        fixture.set_reference_path(child.GetPrim().GetPath())
+                    return attribute_count
+
+                attribute_count = sum(schedule_authoring("author", transforms, add_fixture))
+                MVRImporter._count_fixture_xforms(fixtures, attribute_count, instanceable)
+        if not deferred_save:
+            with report_span("save"):
+                stage.Save()
+
+    def _count_fixture_xforms(fixtures: List[Fixture], attribute_count: int, instanceable: bool):
+        # Scope, xforms and instanceable children. Attributes: fixture attributes, translate, rotate and op order
+        report_count("prims", 1 + len(fixtures) * (2 if instanceable else 1))
+        report_count("attributes", attribute_count + 3 * len(fixtures))
+
+    def _add_fixture_xform_sdf(layer: Sdf.Layer, layers: List[Layer], instanceable: bool = False,
+                               fixture_filter: Callable[[Fixture], bool] = None):
+        mvr_scale = UsdGeom.LinearUnits.millimeters  # MVR dimensions are in millimeters
+        applied_scale: float = SdfTools.get_applied_scale(layer, mvr_scale)
+
+        with Sdf.ChangeBlock():
+            for mvr_layer in layers:
+                fixtures: List[Fixture] = mvr_layer.get_fixtures()
+                if fixture_filter is not None:
+                    fixtures = [x for x in fixtures if fixture_filter(x)]
+                MVRImporter._add_layer_fixtures_sdf(layer, mvr_layer.get_name_usd(), fixtures, applied_scale,
+                                                    instanceable)
 
-    def _convert_gdtf(stage: Usd.Stage, layers: List[Layer], mvr_output_dir: str, archive: ZipFile, ext: str):
-        gdtf_spec_uniq: List[str] = MVRImporter._get_gdtf_to_import(layers)
+    def _add_layer_fixtures_sdf(layer: Sdf.Layer, scope_name: str, fixtures: List[Fixture], applied_scale: float,
+                                instanceable: bool):
+        if len(fixtures) > 0:
+            scope: Sdf.PrimSpec = SdfTools.add_scope(layer, scope_name)
+            np_matrices: np.ndarray = USDTools.np_matrices_from_mvr([x.get_matrix() for x in fixtures])
+            translations, rotations = USDTools.transforms_from_mvr(np_matrices, applied_scale)
+            attribute_count = 0
+            transforms = zip(fixtures, translations.tolist(), rotations.tolist())
+            for i, (fixture, translation, rotate) in enumerate(transforms):
+                report_progress("author", i, len(fixtures), scope_name)
+                xform: Sdf.PrimSpec = SdfTools.add_fixture_xform(layer, scope, fixture.get_unique_name_usd())
+                fixture.set_stage_path(xform.path)
+                SdfTools.set_xform_ops(xform, Gf.Vec3d(*translation), Gf.Vec3f(*rotate))
+                attribute_count += fixture.apply_attributes_to_prim(xform)
+                if instanceable:
+                    child = SdfTools.add_instanceable_child(layer, xform, MVRImporter.INSTANCEABLE_CHILD_NAME)
+                    fixture.set_reference_path(child.path)
+            MVRImporter._count_fixture_xforms(fixtures, attribute_count, instanceable)
+
+    def _convert_gdtf(stage: Usd.Stage, layers: List[Layer], mvr_output_dir: str, archive: ZipFile, ext: str,
+                      context: ConverterContext):
+        gdtf_specs: List[str] = MVRImporter._get_gdtf_to_import(layers, archive, context)
+        MVRImporter._convert_gdtf_specs(gdtf_specs, mvr_output_dir, archive, ext, context)
+
+        gdtf_stage_cache = GDTFStageCache(context.gdtf_stage_cache_size)
+        # Without deferred_save the stage is saved after each reference, those saves are part of the author phase
+        with report_span("author"):
+            if context.deferred_save:
+                MVRImporter._add_gdtf_reference_deferred(layers, stage, ext, gdtf_stage_cache, context.payloads)
+            else:
+                MVRImporter._add_gdtf_reference(layers, stage, ext, gdtf_stage_cache, context.payloads)
+        report_count("attributes", sum([x.fixtures_len() for x in layers]))  # Scale ops
+
+    def _convert_gdtf_specs(gdtf_spec_uniq: List[str], mvr_output_dir: str, archive: ZipFile, ext: str,
+                            context: ConverterContext):
         gdtf_output_dir = mvr_output_dir
-        for gdtf_spec in gdtf_spec_uniq:
-            gdtf.GDTFImporter.convert_from_mvr(gdtf_spec, gdtf_output_dir, archive)
-        MVRImporter._add_gdtf_reference(layers, stage, ext)
+        cache: ConversionCache = None
+        if context.gdtf_conversion_cache_dir is not None:
+            cache = ConversionCache(context.gdtf_conversion_cache_dir, context.gdtf_conversion_cache_max_size)
+
+        with report_span("gdtf"):
+            if MVRImporter._use_gdtf_pool(archive, context) and len(gdtf_spec_uniq) > 1:
+                MVRImporter._convert_gdtf_pool(gdtf_spec_uniq, gdtf_output_dir, archive, ext, context.gdtf_workers,
+                                               cache)
+            else:
+                for i, gdtf_spec in enumerate(gdtf_spec_uniq):
+                    report_progress("gdtf", i, len(gdtf_spec_uniq), gdtf_spec)
+                    gdtf.GDTFImporter.convert_from_mvr(gdtf_spec, gdtf_output_dir, archive, ext, cache)
+
+    def _use_gdtf_pool(archive: ZipFile, context: ConverterContext) -> bool:
+        # Workers reopen the mvr archive by path, an archive read in memory is converted in this process
+        return context.gdtf_workers > 1 and archive.filename is not None
 
-    def _get_gdtf_to_import(layers: List[Layer]) -> List[str]:
-        result: List[str] = []
+    def _convert_gdtf_pool(gdtf_specs: List[str], gdtf_output_dir: str, archive: ZipFile, ext: str, workers: int,
+                           cache: ConversionCache = None):
+        # Each worker opens its own handle on the mvr archive, a ZipFile cannot be shared between processes
+        archive_path: str = archive.filename
+        with create_process_pool(min(workers, len(gdtf_specs))) as pool:
+            futures = {pool.submit(_convert_gdtf_worker, gdtf_spec, gdtf_output_dir, archive_path, ext,
+                                   cache): gdtf_spec for gdtf_spec in gdtf_specs}
+            try:
+                for i, future in enumerate(as_completed(futures)):
+                    gdtf_spec = futures[future]
+                    try:
+                        converted, worker_report = future.result()
+                        report: ImportReport = ImportReport.get_active()
+                        if report is not None:
+                            report.merge(worker_report)
+                        if not converted:
+                            logger = logging.getLogger(__name__)
+                            logger.warn(f"No gdtf file found for {gdtf_spec} in the mvr archive, skipping.")
+                    except Exception as e:
+                        logger = logging.getLogger(__name__)
+                        logger.error(f"Failed to convert gdtf spec {gdtf_spec}. {e}")
+                    report_progress("gdtf", i + 1, len(futures), gdtf_spec)
+            except ImportCancelled:
+                pool.shutdown(cancel_futures=True)  # Specs being converted are completed
+                raise
+
+    def _get_gdtf_to_import(layers: List[Layer], archive: ZipFile, context: ConverterContext) -> List[str]:
+        # Unique specs across every layer, specs missing from the archive are reported once and skipped.
+        # Estimating the work reads every nested gdtf, it only orders the specs of a process pool
+        estimate_work: bool = MVRImporter._use_gdtf_pool(archive, context)
+        plan: ImportPlan = MVRPlanner.plan(layers, archive, estimate_work=estimate_work)
+        for gdtf_spec in plan.get_missing_specs():
+            logger = logging.getLogger(__name__)
+            logger.warn(f"No gdtf file found for {gdtf_spec} in the mvr archive, skipping.")
+        return plan.get_specs_to_convert()
+
+    def _add_gdtf_reference(layers: List[Layer], stage: Usd.Stage, ext: str, gdtf_stage_cache: GDTFStageCache = None,
+                            payload: bool = False):
         for layer in layers:
             if layer.fixtures_len() > 0:
-                current_fixture_names = [x.get_spec_name() for x in layer.get_fixtures()]
-                current_fixture_names_set = set(current_fixture_names)
-                current_fixture_names_uniq = list(current_fixture_names_set)
-                for current_fixture_name_uniq in current_fixture_names_uniq:
-                    result.append(current_fixture_name_uniq)
-        return result
-
-    def _add_gdtf_reference(layers: List[Layer], stage: Usd.Stage, ext: str):
+                def add_reference(item: Tuple[int, Fixture]):
+                    i, fixture = item
+                    report_progress("reference", i, layer.fixtures_len(), layer.get_name())
+                    relative_path = MVRImporter._get_gdtf_relative_path(fixture, ext)
+                    stage_path = fixture.get_reference_path()
+                    USDTools.add_reference(stage, relative_path, stage_path, payload=payload)
+                    USDTools.copy_gdtf_scale(stage, stage_path, relative_path, cache=gdtf_stage_cache)
+
+                schedule_authoring("reference", list(enumerate(layer.get_fixtures())), add_reference)
+
+    def _add_gdtf_reference_deferred(layers: List[Layer], stage: Usd.Stage, ext: str,
+                                     gdtf_stage_cache: GDTFStageCache = None, payload: bool = False):
+        # Gdtf stages are read before opening the change block: the mvr stage cannot be queried reliably within it
+        fixture_references: List[Tuple[str, str, Gf.Vec3d]] = []
         for layer in layers:
             if layer.fixtures_len() > 0:
+                for i, fixture in enumerate(layer.get_fixtures()):
+                    report_progress("reference", i, layer.fixtures_len(), layer.get_name())
+                    relative_path = MVRImporter._get_gdtf_relative_path(fixture, ext)
+                    scale_value: Gf.Vec3d = USDTools.get_gdtf_scale(stage, relative_path, gdtf_stage_cache)
+                    fixture_references.append((relative_path, fixture.get_reference_path(), scale_value))
+
+        def add_reference(fixture_reference: Tuple[str, str, Gf.Vec3d]):
+            relative_path, stage_path, scale_value = fixture_reference
+            USDTools.add_reference(stage, relative_path, stage_path, save=False, payload=payload)
+            USDTools.set_scale(stage, stage_path, scale_value)
+
+        schedule_authoring("reference", fixture_references, add_reference, change_block=True)
+
+    def _add_gdtf_reference_sdf(fixtures: List[Fixture], layer: Sdf.Layer, ext: str, gdtf_stage_cache: GDTFStageCache,
+                                payload: bool = False):
+        fixture_references: List[Tuple[str, Sdf.Path, Gf.Vec3d]] = []
+        for i, fixture in enumerate(fixtures):
+            report_progress("reference", i, len(fixtures))
+            relative_path = MVRImporter._get_gdtf_relative_path(fixture, ext)
+            scale_value: Gf.Vec3d = SdfTools.get_gdtf_scale(layer, relative_path, gdtf_stage_cache)
+            fixture_references.append((relative_path, fixture.get_reference_path(), scale_value))
+
+        with Sdf.ChangeBlock():
+            for relative_path, stage_path, scale_value in fixture_references:
+                SdfTools.add_reference(layer, relative_path, stage_path, payload)
+                SdfTools.add_scale_op(layer.GetPrimAtPath(stage_path), scale_value)
+        report_count("attributes", len(fixture_references))  # Scale ops
+
+    def _add_point_instancers(stage: Usd.Stage, layers: List[Layer], ext: str, gdtf_stage_cache: GDTFStageCache,
+                              payload: bool = False):
+        # One PointInstancer per gdtf spec of a layer instead of one referencing Xform per fixture
+        mvr_scale = UsdGeom.LinearUnits.millimeters  # MVR dimensions are in millimeters
+        applied_scale: float = USDTools.get_applied_scale(stage, mvr_scale)
+
+        for layer in layers:
+            if layer.fixtures_len() > 0:
+                scope: UsdGeom.Scope = USDTools.add_scope(stage, layer.get_name_usd())
+                report_count("prims")
+                fixtures_by_spec: Dict[str, List[Fixture]] = {}
                 for fixture in layer.get_fixtures():
-                    spec = fixture.get_spec_name()
-                    relative_path = f"./{spec}_gdtf/{spec}{ext}"
-                    stage_path = fixture.get_stage_path()
-                    USDTools.add_reference(stage, relative_path, stage_path)
-                    USDTools.copy_gdtf_scale(stage, stage_path, relative_path)
+                    fixtures_by_spec.setdefault(fixture.get_spec_name(), []).append(fixture)
+                instancer_names = NameMapper()
+                for i, (spec_name, fixtures) in enumerate(fixtures_by_spec.items()):
+                    report_progress("author", i, len(fixtures_by_spec), layer.get_name())
+                    MVRImporter._add_point_instancer(stage, scope, instancer_names.get_name(spec_name), fixtures, ext,
+                                                     applied_scale, gdtf_stage_cache, payload)
+
+    def _add_point_instancer(stage: Usd.Stage, scope: UsdGeom.Scope, name: str, fixtures: List[Fixture], ext: str,
+                             applied_scale: float, gdtf_stage_cache: GDTFStageCache, payload: bool = False):
+        instancer: UsdGeom.PointInstancer = USDTools.add_point_instancer(stage, scope, name)
+        prototype: UsdGeom.Xform = USDTools.add_prototype(stage, instancer, name)
+        prototype_path: Sdf.Path = prototype.GetPath()
+        relative_path = MVRImporter._get_gdtf_relative_path(fixtures[0], ext)
+        prototype.ClearXformOpOrder()  # Prevent error when overwritting
+        USDTools.add_reference(stage, relative_path, prototype_path, save=False, payload=payload)
+        USDTools.copy_gdtf_scale(stage, prototype_path, relative_path, save=False, cache=gdtf_stage_cache)
+
+        # Instance transforms are the fixture xform translate and rotateZYX ops, the gdtf scale is on the prototype
+        np_matrices: np.ndarray = USDTools.np_matrices_from_mvr([x.get_matrix() for x in fixtures])
+        translations, rotations = USDTools.transforms_from_mvr(np_matrices, applied_scale)
+        orientations: np.ndarray = USDTools.quaternions_from_rotations(rotations)
+        instancer.CreatePositionsAttr().Set(Vt.Vec3fArray.FromNumpy(translations.astype(np.float32)))
+        instancer.CreateOrientationsAttr().Set(Vt.QuathArray([Gf.Quath(*x) for x in orientations.tolist()]))
+        instancer.CreateProtoIndicesAttr().Set(Vt.IntArray([0] * len(fixtures)))
+        primvar_count: int = MVRImporter._set_fixture_primvars(instancer, fixtures)
+        # Instancer, Prototypes scope and prototype. Attributes: positions, orientations, indices, prototype scale ops
+        report_count("prims", 3)
+        report_count("attributes", 5 + primvar_count)
+
+    def _set_fixture_primvars(instancer: UsdGeom.PointInstancer, fixtures: List[Fixture]) -> int:
+        # Fixture attributes become per instance primvars indexed by instance id, unset values use the type default.
+        # Values of list attributes are concatenated in a constant primvar, "<name>Counts" holds each fixture count.
+        attributes: Dict[str, Tuple[Sdf.ValueTypeNames, Dict[int, object]]] = {}
+        for index, fixture in enumerate(fixtures):
+            for name, attribute_type, value in fixture.get_attributes():
+                attributes.setdefault(name, (attribute_type, {}))[1][index] = value
+
+        instance_ids = range(len(fixtures))
+        for name, (attribute_type, values) in attributes.items():
+            if attribute_type.isArray:
+                counts: List[int] = [len(values.get(x, [])) for x in instance_ids]
+                flattened: List = [value for x in instance_ids for value in values.get(x, [])]
+                USDTools.set_fixture_primvar(instancer, name, attribute_type, flattened, UsdGeom.Tokens.constant)
+                USDTools.set_fixture_primvar(instancer, f"{name}Counts", Sdf.ValueTypeNames.IntArray, counts)
+            else:
+                per_instance: List = [values.get(x, attribute_type.defaultValue) for x in instance_ids]
+                USDTools.set_fixture_primvar(instancer, name, attribute_type.arrayType, per_instance)
+        # Returns the number of primvars authored
+        return len(attributes) + len([x for x, _ in attributes.values() if x.isArray])
+
+    def _get_gdtf_relative_path(fixture: Fixture, ext: str) -> str:
+        spec = fixture.get_spec_name()
+        return f"./{spec}_gdtf/{spec}{ext}"
+
+
+def _author_sublayer_worker(url: str, scope_name: str, fixtures: List[Fixture], ext: str, instanceable: bool,
+                            payload: bool, gdtf_stage_cache_size: int) -> Dict[str, object]:
+    report = ImportReport()
+    with report.activate():
+        MVRImporter._author_sublayer(url, scope_name, fixtures, ext, instanceable, payload, gdtf_stage_cache_size)
+    return report.to_dict()
+
+
+def _convert_gdtf_worker(gdtf_spec: str, gdtf_output_dir: str, archive_path: str, ext: str,
+                         cache: ConversionCache = None) -> Tuple[bool, Dict[str, object]]:
+    # The worker report is returned to be merged in the report of the import
+    report = ImportReport()
+    with report.activate(), ZipFile(archive_path, 'r') as archive:
+        converted: bool = gdtf.GDTFImporter.convert_from_mvr(gdtf_spec, gdtf_output_dir, archive, ext, cache)
+    return converted, report.to_dict()
@@ -0,0 +1,88 @@
+import logging
+from typing import Dict, List
+import xml.etree.ElementTree as ET
+from zipfile import ZipFile
+
+from mf.ov.gdtf import gdtfImporter as gdtf
+from mf.ov.gdtf.archiveIndex import ArchiveIndex
+from mf.ov.gdtf.nestedArchive import NestedArchive
+
+from .mvrUtil import Layer
+
+
+class GDTFSpecPlan:
+    def __init__(self, name: str):
+        self.name = name
+        self.fixture_count = 0
+        self.layers: List[str] = []
+        self.missing = False  # No "{name}.gdtf" member in the mvr archive
+        self.archive_bytes = 0  # Uncompressed size of the gdtf member
+        self.model_count = 0  # Models with a file found in the gdtf archive
+        self.conversions_3ds = 0  # Models only available as 3ds, converted through an external process
+
+    def __str__(self) -> str:
+        if self.missing:
+            return f"{self.name}: {self.fixture_count} fixtures, missing from the archive"
+        return (f"{self.name}: {self.fixture_count} fixtures, {self.model_count} models "
+                f"({self.conversions_3ds} from 3ds), {self.archive_bytes} bytes")
+
+
+class ImportPlan:
+    def __init__(self):
+        self.specs: Dict[str, GDTFSpecPlan] = {}
+        self.fixture_count = 0
+
+    def get_specs_to_convert(self) -> List[str]:
+        # Each spec once across every layer, most expensive first so a process pool finishes them early
+        specs = [x for x in self.specs.values() if not x.missing]
+        specs.sort(key=lambda x: (x.conversions_3ds, x.archive_bytes), reverse=True)
+        return [x.name for x in specs]
+
+    def get_missing_specs(self) -> List[str]:
+        return [x.name for x in self.specs.values() if x.missing]
+
+    def __str__(self) -> str:
+        lines = [f"{self.fixture_count} fixtures, {len(self.specs)} gdtf specs, "
+                 f"{len(self.get_missing_specs())} missing"]
+        lines.extend([f"  {x}" for x in self.specs.values()])
+        return "\n".join(lines)
+
+
+class MVRPlanner:
+    def plan(layers: List[Layer], archive: ZipFile, estimate_work: bool = True) -> ImportPlan:
+        # Scans the scene once, nothing is converted or written
+        plan = ImportPlan()
+        for layer in layers:
+            for fixture in layer.get_fixtures():
+                spec_name: str = fixture.get_spec_name()
+                spec_plan: GDTFSpecPlan = plan.specs.get(spec_name)
+                if spec_plan is None:
+                    spec_plan = GDTFSpecPlan(spec_name)
+                    plan.specs[spec_name] = spec_plan
+                spec_plan.fixture_count += 1
+                if len(spec_plan.layers) == 0 or spec_plan.layers[-1] != layer.get_name_usd():
+                    spec_plan.layers.append(layer.get_name_usd())
+                plan.fixture_count += 1
+
+        index: ArchiveIndex = ArchiveIndex.get_shared(archive)
+        for spec_plan in plan.specs.values():
+            member = index.get_info(spec_plan.name + ".gdtf")
+            if member is None:
+                spec_plan.missing = True
+                continue
+            spec_plan.archive_bytes = member.file_size
+            if estimate_work:
+                MVRPlanner._estimate_models(spec_plan, archive)
+        return plan
+
+    def _estimate_models(spec_plan: GDTFSpecPlan, archive: ZipFile):
+        try:
+            with NestedArchive(archive, spec_plan.name + ".gdtf") as gdtf_archive:
+                root = ET.fromstring(gdtf_archive.read("description.xml"))
+                model_files: List[str] = gdtf.GLTFImporter.get_model_files(root, gdtf_archive)
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.warn(f"Could not estimate the conversion of {spec_plan.name}. {e}")
+            return
+        spec_plan.model_count = len(model_files)
+        spec_plan.conversions_3ds = len([x for x in model_files if x.endswith(".3ds")])
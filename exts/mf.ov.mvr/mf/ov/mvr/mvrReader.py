@@ -0,0 +1,68 @@
+from typing import Dict, IO, Iterator, List, Tuple
+import xml.etree.ElementTree as ET
+
+from .mvrUtil import Layer, Fixture
+
+
+class MVRSceneReader:
+    # Streams GeneralSceneDescription.xml, elements are released once read so that only the current batch
+    # of fixture nodes is held in memory instead of the whole document
+    SPINE: List[str] = ["GeneralSceneDescription", "Scene", "Layers", "Layer", "ChildList"]
+
+    def __init__(self, source: IO[bytes], batch_size: int = 1000):
+        self._source = source
+        self._batch_size = max(1, batch_size)
+        self._root_attrib: Dict[str, str] = {}
+
+    def get_root_attrib(self) -> Dict[str, str]:
+        return self._root_attrib
+
+    def read(self) -> Iterator[Tuple[Layer, List[Fixture]]]:
+        # Yields fixture batches along with their layer, every layer is yielded at least once
+        elements: List[ET.Element] = []
+        tags: List[str] = []
+        layer: Layer = None
+        batch: List[ET.Element] = []
+
+        for event, element in ET.iterparse(self._source, events=("start", "end")):
+            if event == "start":
+                elements.append(element)
+                tags.append(element.tag)
+                if len(tags) == 1:
+                    self._root_attrib = dict(element.attrib)
+                elif MVRSceneReader._is_layer(tags):
+                    layer = Layer(element)
+                continue
+
+            parent: ET.Element = elements[-2] if len(elements) > 1 else None
+            if MVRSceneReader._is_fixture(tags):
+                batch.append(element)
+                if len(batch) >= self._batch_size:
+                    yield layer, MVRSceneReader._flush(batch, parent)
+            elif MVRSceneReader._is_layer(tags):
+                yield layer, MVRSceneReader._flush(batch, elements[-1].find("ChildList"))
+                element.clear()
+                parent.remove(element)
+                layer = None
+            elif parent is not None and MVRSceneReader._is_spine(tags[:-1]) and not MVRSceneReader._is_spine(tags):
+                parent.remove(element)  # Not imported (UserData, AUXData, other scene objects...)
+
+            elements.pop()
+            tags.pop()
+
+    def _flush(batch: List[ET.Element], childlist: ET.Element) -> List[Fixture]:
+        fixtures: List[Fixture] = [Fixture(x) for x in batch]
+        if childlist is not None:
+            for element in batch:
+                childlist.remove(element)
+        batch.clear()
+        return fixtures
+
+    def _is_spine(tags: List[str]) -> bool:
+        return tags[1:] == MVRSceneReader.SPINE[1:len(tags)]
+
+    def _is_layer(tags: List[str]) -> bool:
+        return len(tags) == 4 and MVRSceneReader._is_spine(tags)
+
+    def _is_fixture(tags: List[str]) -> bool:
+        return len(tags) == 6 and tags[-1] == "Fixture" and MVRSceneReader._is_spine(tags[:-1])
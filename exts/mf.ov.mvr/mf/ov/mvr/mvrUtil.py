@@ -1,8 +1,10 @@
-from typing import List
+import hashlib
+from typing import List, Tuple, Union
 import xml.etree.ElementTree as ET
 
 from pxr import Usd, Sdf
 
+from .SdfTools import SdfTools
 from .USDTools import USDTools
 
 
@@ -23,19 +25,50 @@ class Fixture:
         self._custom_id = self._get_value_int_if_exists("CustomId")
         self._cie_color = self._get_color_values()
         self._cast_shadow = self._get_value_bool_if_exists("CastShadow")
+        self._reference_path = None
+        self._unique_name_usd = None
+        self._root = None  # Every value has been read, do not keep the xml tree alive
+
+    def get_name(self) -> str:
+        return self._name
 
     def get_unique_name_usd(self) -> str:
-        return USDTools.make_name_valid(self._name + "_" + self._uuid)
+        if self._unique_name_usd is None:
+            return USDTools.make_name_valid(self._name + "_" + self._uuid)
+        return self._unique_name_usd
+
+    def set_unique_name_usd(self, name: str):
+        # Unique among the fixtures of the layer, assigned by the importer
+        self._unique_name_usd = name
+
+    def get_uuid(self) -> str:
+        return self._uuid
 
     def get_matrix(self) -> str:
         return self._matrix
 
+    def get_fingerprint(self) -> str:
+        # Changes whenever a parsed value authored on the fixture prim changes
+        values = [self._name, self._uuid, self._matrix, self._gdtf_spec, self._gdtf_mode, self._custom_commands,
+                  self._classing, self._addresses, self._fixture_id, self._unit_number, self._fixture_type_id,
+                  self._custom_id, self._cie_color, self._cast_shadow]
+        return hashlib.sha1(repr(values).encode()).hexdigest()
+
     def set_stage_path(self, path: str):
         self._stage_path = path
 
     def get_stage_path(self) -> str:
         return self._stage_path
 
+    def set_reference_path(self, path: str):
+        self._reference_path = path
+
+    def get_reference_path(self) -> str:
+        # Prim holding the gdtf reference, the fixture xform itself unless references are instanceable
+        if self._reference_path is None:
+            return self._stage_path
+        return self._reference_path
+
     def get_spec_name(self) -> str:
         spec_name = self._gdtf_spec
         if self._gdtf_spec[-5:] == ".gdtf":
@@ -90,44 +123,37 @@ class Fixture:
             colors = [float(x) for x in node.text.split(",")]
         return colors
 
-    def apply_attributes_to_prim(self, prim: Usd.Prim):
-        self._set_attribute_text_if_valid(prim, "name", self._name)
-        self._set_attribute_text_if_valid(prim, "uuid", self._uuid)
-        self._set_attribute_text_if_valid(prim, "GDTFSpec", self._gdtf_spec)
-        self._set_attribute_text_if_valid(prim, "GDTFMode", self._gdtf_mode)
-        self._set_attribute_textarray_if_valid(prim, "CustomCommands", self._custom_commands)
-        self._set_attribute_text_if_valid(prim, "Classing", self._classing)
-        self._set_attribute_intarray_if_valid(prim, "Addresses", self._addresses)
-        self._set_attribute_int_if_valid(prim, "FixtureID", self._fixture_id)
-        self._set_attribute_int_if_valid(prim, "UnitNumber", self._unit_number)
-        self._set_attribute_int_if_valid(prim, "FixtureTypeId", self._fixture_type_id)
-        self._set_attribute_int_if_valid(prim, "CustomId", self._custom_id)
-        self._set_attribute_floatarray_if_valid(prim, "CIEColor", self._cie_color)
-        self._set_attribute_bool_if_value(prim, "CastShadow", self._cast_shadow)
-
-    def _set_attribute_text_if_valid(self, prim: Usd.Prim, name: str, value: str):
-        if value is not None:
-            USDTools.set_fixture_attribute(prim, name, Sdf.ValueTypeNames.String, value)
-
-    def _set_attribute_int_if_valid(self, prim: Usd.Prim, name: str, value: int):
-        if value is not None:
-            USDTools.set_fixture_attribute(prim, name, Sdf.ValueTypeNames.Int, value)
-
-    def _set_attribute_bool_if_value(self, prim: Usd.Prim, name: str, value: bool):
-        if value is not None:
-            USDTools.set_fixture_attribute(prim, name, Sdf.ValueTypeNames.Bool, value)
-
-    def _set_attribute_textarray_if_valid(self, prim: Usd.Prim, name: str, value: List[str]):
-        if value is not None and len(value) > 0:
-            USDTools.set_fixture_attribute(prim, name, Sdf.ValueTypeNames.StringArray, value)
-
-    def _set_attribute_intarray_if_valid(self, prim: Usd.Prim, name: str, value: List[int]):
-        if value is not None and len(value) > 0:
-            USDTools.set_fixture_attribute(prim, name, Sdf.ValueTypeNames.IntArray, value)
-
-    def _set_attribute_floatarray_if_valid(self, prim: Usd.Prim, name: str, value: List[float]):
-        if value is not None and len(value) > 0:
-            USDTools.set_fixture_attribute(prim, name, Sdf.ValueTypeNames.FloatArray, value)
+    def get_attributes(self) -> List[Tuple[str, Sdf.ValueTypeNames, object]]:
+        # Values authored as mf:mvr:* attributes, unset values and empty lists are skipped
+        attributes = [
+            ("name", Sdf.ValueTypeNames.String, self._name),
+            ("uuid", Sdf.ValueTypeNames.String, self._uuid),
+            ("GDTFSpec", Sdf.ValueTypeNames.String, self._gdtf_spec),
+            ("GDTFMode", Sdf.ValueTypeNames.String, self._gdtf_mode),
+            ("CustomCommands", Sdf.ValueTypeNames.StringArray, self._custom_commands),
+            ("Classing", Sdf.ValueTypeNames.String, self._classing),
+            ("Addresses", Sdf.ValueTypeNames.IntArray, self._addresses),
+            ("FixtureID", Sdf.ValueTypeNames.Int, self._fixture_id),
+            ("UnitNumber", Sdf.ValueTypeNames.Int, self._unit_number),
+            ("FixtureTypeId", Sdf.ValueTypeNames.Int, self._fixture_type_id),
+            ("CustomId", Sdf.ValueTypeNames.Int, self._custom_id),
+            ("CIEColor", Sdf.ValueTypeNames.FloatArray, self._cie_color),
+            ("CastShadow", Sdf.ValueTypeNames.Bool, self._cast_shadow),
+        ]
+        return [x for x in attributes if x[2] is not None and (not x[1].isArray or len(x[2]) > 0)]
+
+    def apply_attributes_to_prim(self, prim: Union[Usd.Prim, Sdf.PrimSpec]) -> int:
+        # Returns the number of attributes authored
+        attributes = self.get_attributes()
+        for name, attribute_type, value in attributes:
+            self._set_attribute(prim, name, attribute_type, value)
+        return len(attributes)
+
+    def _set_attribute(self, prim: Union[Usd.Prim, Sdf.PrimSpec], name: str, attribute_type: Sdf.ValueTypeNames, value):
+        if isinstance(prim, Sdf.PrimSpec):
+            SdfTools.set_fixture_attribute(prim, name, attribute_type, value)
+        else:
+            USDTools.set_fixture_attribute(prim, name, attribute_type, value)
 
 
 class Layer:
@@ -136,9 +162,18 @@ class Layer:
         self._uuid = node.attrib["uuid"]
         self._node = node
         self._fixtures = []
+        self._name_usd = None
+
+    def get_name(self) -> str:
+        return self._name
 
     def get_name_usd(self) -> str:
-        return USDTools.make_name_valid(self._name)
+        if self._name_usd is None:
+            return USDTools.make_name_valid(self._name)
+        return self._name_usd
+
+    def set_name_usd(self, name: str):
+        self._name_usd = name
 
     def find_fixtures(self):
         childlist = self._node.find("ChildList")
@@ -146,6 +181,9 @@ class Layer:
             fixtures = childlist.findall("Fixture")
             self._fixtures = [Fixture(x) for x in fixtures]
 
+    def add_fixtures(self, fixtures: List[Fixture]):
+        self._fixtures.extend(fixtures)
+
     def fixtures_len(self) -> int:
         return len(self._fixtures)
 
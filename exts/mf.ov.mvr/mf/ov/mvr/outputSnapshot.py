@@ -0,0 +1,49 @@
+import omni.client
+import os
+import shutil
+import tempfile
+from typing import Dict, List
+
+from pxr import Sdf
+
+from .filepathUtility import Filepath
+
+
+class OutputSnapshot:
+    # Copies of the layers an import is about to write, put back when the import is cancelled.
+    # Layers the import creates are deleted. Converted gdtf specs are kept, each one is complete once written
+    def __init__(self, urls: List[str]):
+        self._backup_dir: str = tempfile.mkdtemp(prefix="mf_ov_mvr_snapshot_")
+        self._backups: Dict[str, str] = {}  # Layer url: backup path, None when the layer does not exist yet
+        for i, url in enumerate(urls):
+            backup_path: str = os.path.join(self._backup_dir, f"{i}{os.path.splitext(url)[1]}")
+            self._backups[url] = backup_path if OutputSnapshot._copy(url, backup_path) else None
+
+    def restore(self):
+        for url, backup_path in self._backups.items():
+            if backup_path is None:
+                OutputSnapshot._delete(url)
+                continue
+            OutputSnapshot._copy(backup_path, url)
+            layer: Sdf.Layer = Sdf.Layer.Find(url)
+            if layer is not None:
+                layer.Reload(force=True)  # Edits of the cancelled import not saved yet are dropped as well
+
+    def discard(self):
+        shutil.rmtree(self._backup_dir, ignore_errors=True)
+
+    def _copy(source: str, destination: str) -> bool:
+        # Returns False when there is no source layer
+        if Filepath(source).is_nucleus_path() or Filepath(destination).is_nucleus_path():
+            result = omni.client.copy(source, destination, omni.client.CopyBehavior.OVERWRITE)
+            return result == omni.client.Result.OK
+        if not os.path.isfile(source):
+            return False
+        shutil.copyfile(source, destination)
+        return True
+
+    def _delete(url: str):
+        if Filepath(url).is_nucleus_path():
+            omni.client.delete(url)
+        elif os.path.isfile(url):
+            os.remove(url)
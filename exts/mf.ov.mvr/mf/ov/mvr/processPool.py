@@ -0,0 +1,14 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import sys
+
+
+def create_process_pool(workers: int) -> ProcessPoolExecutor:
+    # Spawned workers, forking a process running Kit or holding open stages is unsafe
+    mp_context = multiprocessing.get_context("spawn")
+    # Kit embeds python: point the workers to the bundled interpreter rather than to the kit executable
+    if not os.path.basename(sys.executable).lower().startswith("python"):
+        interpreter = "python.exe" if sys.platform == "win32" else "bin/python3"
+        mp_context.set_executable(os.path.join(sys.prefix, interpreter))
+    return ProcessPoolExecutor(max_workers=workers, mp_context=mp_context)